@@ -0,0 +1,227 @@
+# app/amfi_loader.py
+# Streaming parser + batched upserts for AMFI's semicolon-delimited NAV files:
+#   - NAVAll.txt (latest NAV of every scheme)
+#   - NAV history reports (DownloadNAVHistoryReport_Po.aspx)
+# Both files share the same layout: a header row naming the columns, then
+# blocks of "<category header>" / "<AMC name>" lines followed by
+# "code;...;nav;...;date" rows.
+import time
+from datetime import date, datetime
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import MutualFund, NavHistory
+
+DEFAULT_BATCH_SIZE = 5000
+# One multi-row INSERT may bind at most 32,767 parameters on asyncpg and
+# 32,766 on a default SQLite build; stay a little below both.
+MAX_BIND_PARAMS = 32000
+
+
+class NavRecord(NamedTuple):
+    scheme_code: str
+    scheme_name: str
+    category: Optional[str]
+    nav: float
+    nav_date: date
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+_DATE_FORMATS = ("%d-%b-%Y", "%d-%m-%Y")
+_date_cache: dict[str, Optional[date]] = {}
+
+
+def parse_nav_date(value: str) -> Optional[date]:
+    # A file has only a few thousand distinct dates, so memoize the strptime calls
+    cached = _date_cache.get(value, False)
+    if cached is not False:
+        return cached
+    parsed = None
+    for fmt in _DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).date()
+            break
+        except ValueError:
+            continue
+    _date_cache[value] = parsed
+    return parsed
+
+
+def _category_from_header(line: str) -> Optional[str]:
+    # "Open Ended Schemes(Equity Scheme - Large Cap Fund)" -> "Equity Scheme - Large Cap Fund"
+    start, end = line.find("("), line.rfind(")")
+    if "Schemes" in line and 0 <= start < end:
+        return line[start + 1:end].strip()
+    return None
+
+
+def iter_nav_records(lines: Iterable[str]) -> Iterator[NavRecord]:
+    """
+    Lazily parses AMFI NAV lines, one line at a time. Rows with a missing
+    or non-numeric NAV ("N.A.") or an unparseable date are skipped.
+    """
+    columns = None
+    category = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+
+        if ";" not in line:
+            # Category header or AMC name
+            category = _category_from_header(line) or category
+            continue
+
+        fields = line.split(";")
+        if columns is None:
+            header = {name.strip(): i for i, name in enumerate(fields)}
+            try:
+                columns = (
+                    header["Scheme Code"],
+                    header["Scheme Name"],
+                    header["Net Asset Value"],
+                    header["Date"],
+                )
+            except KeyError:
+                raise ValueError(f"Unrecognised AMFI header: {line}")
+            continue
+
+        code_i, name_i, nav_i, date_i = columns
+        if len(fields) <= max(columns):
+            continue
+        try:
+            nav = float(fields[nav_i])
+        except ValueError:
+            continue
+        nav_date = parse_nav_date(fields[date_i].strip())
+        if nav_date is None:
+            continue
+
+        yield NavRecord(
+            fields[code_i].strip(),
+            fields[name_i].strip(),
+            category,
+            nav,
+            nav_date,
+        )
+
+
+def iter_nav_file(path: str) -> Iterator[NavRecord]:
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        yield from iter_nav_records(fh)
+
+
+# ---------------------------
+# Batched upserts
+# ---------------------------
+def _insert_for(session: AsyncSession):
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Bulk upsert is not supported for the '{dialect}' dialect")
+    return insert
+
+
+def _chunks(rows: list, size: int) -> Iterator[list]:
+    # split a VALUES list so no single statement exceeds MAX_BIND_PARAMS
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+async def upsert_batch(session: AsyncSession, batch: list[NavRecord], with_history: bool = True) -> None:
+    insert = _insert_for(session)
+
+    # Latest row per scheme in this batch (history files repeat a scheme many times)
+    latest: dict[str, NavRecord] = {}
+    for rec in batch:
+        cur = latest.get(rec.scheme_code)
+        if cur is None or rec.nav_date >= cur.nav_date:
+            latest[rec.scheme_code] = rec
+
+    funds = MutualFund.__table__
+    fund_rows = [
+        {
+            "scheme_code": r.scheme_code,
+            "name": r.scheme_name,
+            "category": r.category,
+            "nav": r.nav,
+            "nav_date": r.nav_date,
+        }
+        for r in latest.values()
+    ]
+    for chunk in _chunks(fund_rows, MAX_BIND_PARAMS // 5):
+        stmt = insert(funds).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[funds.c.scheme_code],
+            set_={
+                "name": stmt.excluded.name,
+                "category": stmt.excluded.category,
+                "nav": stmt.excluded.nav,
+                "nav_date": stmt.excluded.nav_date,
+            },
+            # never let an older history row overwrite a newer latest NAV
+            where=funds.c.nav_date.is_(None) | (stmt.excluded.nav_date >= funds.c.nav_date),
+        )
+        await session.execute(stmt)
+
+    if with_history:
+        history = NavHistory.__table__
+        rows = {(r.scheme_code, r.nav_date): r.nav for r in batch}
+        history_rows = [
+            {"scheme_code": code, "nav_date": d, "nav": nav}
+            for (code, d), nav in rows.items()
+        ]
+        for chunk in _chunks(history_rows, MAX_BIND_PARAMS // 3):
+            hstmt = insert(history).values(chunk)
+            hstmt = hstmt.on_conflict_do_update(
+                index_elements=[history.c.scheme_code, history.c.nav_date],
+                set_={"nav": hstmt.excluded.nav},
+            )
+            await session.execute(hstmt)
+
+
+async def load_records(
+    session: AsyncSession,
+    records: Iterable[NavRecord],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    with_history: bool = True,
+    progress=None,
+) -> dict:
+    """
+    Upserts records in batches of `batch_size`, committing after every batch
+    so memory stays flat regardless of file size. `progress(rows, elapsed)`
+    is called after each batch.
+    """
+    started = time.perf_counter()
+    total = 0
+    batch: list[NavRecord] = []
+
+    async def flush():
+        nonlocal total, batch
+        await upsert_batch(session, batch, with_history=with_history)
+        await session.commit()
+        total += len(batch)
+        batch = []
+        if progress:
+            progress(total, time.perf_counter() - started)
+
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": total,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
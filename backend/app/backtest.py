@@ -0,0 +1,204 @@
+# app/backtest.py
+# SIP / lump-sum backtesting over every possible start date at once.
+#
+# For S start dates and a K-month horizon the installment dates form an
+# (S, K + 1) matrix; np.searchsorted maps each to the first NAV on or after
+# it, so units, final values and XIRR for all starts are computed as whole
+# array operations (no Python loop over start dates). A lump sum only needs
+# the first and last column. The endpoint runs the math in a worker thread.
+from __future__ import annotations
+
+import asyncio
+
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, HTTPException, Path, Query
+
+from app import upstream
+from app.fundDetail import _parse_nav_arrays
+
+if TYPE_CHECKING:
+    import numpy as np
+
+router = APIRouter()
+
+BASE_URL = "https://api.mfapi.in/mf"
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# ---------- Engine ----------
+def _monthly_schedule(starts: np.ndarray, months: int, ends_only: bool = False) -> np.ndarray:
+    """
+    (S, months + 1) matrix of calendar dates: each start shifted by
+    0..months months, keeping the day of month (clipped to month end).
+    With ends_only only the 0 and `months` columns are built, (S, 2).
+    """
+    import numpy as np
+
+    start_month = starts.astype("datetime64[M]")
+    day = (starts - start_month.astype("datetime64[D]")).astype(np.int64)
+    steps = np.array([0, months]) if ends_only else np.arange(months + 1)
+    month = start_month[:, None] + steps
+    month_start = month.astype("datetime64[D]")
+    month_len = ((month + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    return month_start + np.minimum(day[:, None], month_len - 1)
+
+
+def xirr(times: np.ndarray, flows: np.ndarray, guess: float = 0.1, max_iter: int = 50, tol: float = 1e-8) -> np.ndarray:
+    """
+    Vectorized Newton solver: one annualized rate per row of cash flows.
+    `times` are in years from the first flow. Rows that don't converge are NaN.
+    """
+    import numpy as np
+
+    rate = np.full(flows.shape[0], guess, dtype=np.float64)
+    active = np.ones(flows.shape[0], dtype=bool)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(max_iter):
+            r = rate[active, None]
+            t = times[active]
+            f = flows[active]
+            disc = (1.0 + r) ** -t
+            npv = (f * disc).sum(axis=1)
+            d_npv = (-t * f * disc / (1.0 + r)).sum(axis=1)
+            step = npv / d_npv
+            bad = ~np.isfinite(step)
+            new_rate = np.clip(rate[active] - step, -0.9999, 100.0)
+            new_rate[bad] = np.nan
+            done = bad | (np.abs(step) < tol)
+            rate[active] = new_rate
+            idx = np.flatnonzero(active)
+            active[idx[done]] = False
+            if not active.any():
+                break
+        # whatever is still active didn't converge
+        rate[active] = np.nan
+        rate[~np.isfinite(rate)] = np.nan
+    return rate
+
+
+def simulate(dates: np.ndarray, navs: np.ndarray, months: int, amount: float, mode: str = "sip") -> dict:
+    """
+    Simulates `mode` ("sip" = `amount` every month for `months` months,
+    "lumpsum" = `amount` once, held `months` months) for every NAV date that
+    leaves room for the full horizon. Returns per-start arrays.
+    """
+    import numpy as np
+
+    schedule = _monthly_schedule(dates, months, ends_only=mode != "sip")
+    idx = np.searchsorted(dates, schedule, side="left")
+    valid = idx[:, -1] < len(dates)
+    idx = idx[valid]
+    if not len(idx):
+        raise ValueError(f"Not enough NAV history for a {months}-month backtest")
+
+    exec_dates = dates[idx]
+    prices = navs[idx]
+    end_nav = prices[:, -1]
+
+    if mode == "sip":
+        units = (amount / prices[:, :-1]).sum(axis=1)
+        invested = np.full(len(idx), amount * months)
+        value = units * end_nav
+        # installments out, final value in
+        flows = np.empty(prices.shape, dtype=np.float64)
+        flows[:, :-1] = -amount
+        flows[:, -1] = value
+        times = (exec_dates - exec_dates[:, :1]).astype(np.float64) / 365.0
+        annualized = xirr(times, flows)
+    else:
+        invested = np.full(len(idx), float(amount))
+        value = amount * end_nav / prices[:, 0]
+        years = (exec_dates[:, -1] - exec_dates[:, 0]).astype(np.float64) / 365.0
+        # XIRR of a single outflow / inflow pair is the CAGR
+        annualized = (value / invested) ** (1.0 / years) - 1.0
+
+    return {
+        "start_dates": exec_dates[:, 0],
+        "invested": invested,
+        "value": value,
+        "xirr": annualized,
+    }
+
+
+def summarize(result: dict) -> dict:
+    import numpy as np
+
+    rates = result["xirr"]
+    ok = np.isfinite(rates)
+    rates_ok = rates[ok] * 100
+    starts = result["start_dates"][ok]
+    gain = (result["value"] / result["invested"] - 1) * 100
+
+    if not len(rates_ok):
+        raise ValueError("Could not compute XIRR for any start date")
+
+    counts, edges = np.histogram(rates_ok, bins=20)
+    best, worst = int(np.argmax(rates_ok)), int(np.argmin(rates_ok))
+    return {
+        "simulations": int(len(rates)),
+        "first_start": str(result["start_dates"][0]),
+        "last_start": str(result["start_dates"][-1]),
+        "xirr_pct": {
+            "mean": round(float(rates_ok.mean()), 2),
+            **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(rates_ok, PERCENTILES))},
+            "best": {"start": str(starts[best]), "xirr_pct": round(float(rates_ok[best]), 2)},
+            "worst": {"start": str(starts[worst]), "xirr_pct": round(float(rates_ok[worst]), 2)},
+        },
+        "absolute_return_pct": {
+            "mean": round(float(gain.mean()), 2),
+            "median": round(float(np.median(gain)), 2),
+        },
+        "probability_of_loss_pct": round(float((result["value"] < result["invested"]).mean() * 100), 2),
+        "histogram": {
+            "bin_edges_pct": [round(float(e), 2) for e in edges],
+            "counts": counts.tolist(),
+        },
+    }
+
+
+def _run_backtest(dates: np.ndarray, navs: np.ndarray, months: int, amount: float, mode: str) -> dict:
+    return summarize(simulate(dates, navs, months, amount, mode))
+
+
+# ---------- Endpoint ----------
+@router.get("/{scheme_code}")
+async def backtest_fund(
+    scheme_code: str = Path(..., description="Mutual fund scheme code"),
+    mode: str = Query("sip", pattern="^(sip|lumpsum)$"),
+    amount: float = Query(5000, gt=0, description="Monthly installment (sip) or one-time amount (lumpsum)"),
+    months: int = Query(36, ge=1, le=360, description="Investment horizon in months"),
+):
+    url = f"{BASE_URL}/{scheme_code}"
+    try:
+        payload = await upstream.fetch_json(url)
+        history = payload.get("data", [])
+        if not history:
+            raise HTTPException(status_code=502, detail="No NAV history from upstream")
+
+        dates, navs = _parse_nav_arrays(history)
+        try:
+            # a long SIP horizon is hundreds of ms of CPU, keep it off the event loop
+            stats = await asyncio.to_thread(_run_backtest, dates, navs, months, amount, mode)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+        return {
+            "scheme_code": scheme_code,
+            "scheme_name": payload.get("meta", {}).get("scheme_name"),
+            "mode": mode,
+            "amount": amount,
+            "months": months,
+            **stats,
+            "disclaimer": "Based on historical NAV; past performance does not guarantee future returns.",
+        }
+    except HTTPException:
+        raise
+    except upstream.UpstreamHTTPError as exc:
+        if exc.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Mutual fund with code {scheme_code} not found")
+        raise HTTPException(status_code=502, detail=exc.detail)
+    except upstream.UpstreamUnavailable as exc:
+        raise HTTPException(status_code=503, detail=f"Error contacting external API: {exc.detail}")
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Processing error: {exc}")
@@ -0,0 +1,279 @@
+# app/catalog.py
+# Compact, shared scheme catalog.
+#
+# The scheme list (code -> name) is packed into one flat file:
+#
+#   header | codes int64[n] | by_code int32[n] | name offsets int64[n + 1]
+#          | lower offsets int64[n + 1] | names (UTF-8) | lower names (UTF-8)
+#
+# `names` holds the display names (the "Scheme" word stripped, as the
+# endpoints always returned them), `lower` the lowercased raw names, each
+# preceded by a NUL so substring / prefix search is a plain bytes find over
+# one buffer. One process publishes the file (atomic rename), every worker
+# mmaps it read-only, so the page cache holds a single copy for all workers
+# and no per-fund Python objects are built until a row is actually returned.
+import asyncio
+import bisect
+import mmap
+import os
+import struct
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+CATALOG_PATH = os.getenv(
+    "CATALOG_PATH",
+    os.path.join(os.path.dirname(__file__), "..", ".scheme_catalog.bin"),
+)
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", "86400"))
+CATALOG_RECHECK = float(os.getenv("CATALOG_RECHECK", "60"))
+
+MAGIC = b"MFCAT001"
+# magic, count, names bytes, lower bytes, built_at
+_HEADER = struct.Struct("<8sQQQd")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def display_name(name: str) -> str:
+    return name.replace("Scheme", "").strip()
+
+
+# ---------------------------
+# Build / publish
+# ---------------------------
+def pack(schemes: dict) -> bytes:
+    """
+    Packs a {code: name} dict (Mftool.get_scheme_codes()) into the catalog
+    layout. Rows keep the dict order; keys that aren't plain scheme numbers
+    (e.g. the NAVAll header line) are dropped.
+    """
+    codes, names, lowers = [], [], []
+    for code, name in schemes.items():
+        code = str(code).strip()
+        if not code.isdigit() or str(int(code)) != code:
+            continue
+        name = name or ""
+        codes.append(int(code))
+        names.append(display_name(name).encode("utf-8"))
+        lowers.append(name.lower().replace("\x00", "").encode("utf-8"))
+
+    n = len(codes)
+    name_offsets = [0] * (n + 1)
+    for i, b in enumerate(names):
+        name_offsets[i + 1] = name_offsets[i] + len(b)
+    # every lowered name is preceded by a NUL; offsets point past it
+    lower_offsets = [0] * (n + 1)
+    pos = 0
+    for i, b in enumerate(lowers):
+        lower_offsets[i] = pos + 1
+        pos += 1 + len(b)
+    lower_offsets[n] = pos + 1
+    names_buf = b"".join(names)
+    lower_buf = b"".join(b"\x00" + b for b in lowers) + b"\x00"
+
+    by_code = sorted(range(n), key=codes.__getitem__)
+    parts = [
+        _HEADER.pack(MAGIC, n, len(names_buf), len(lower_buf), time.time()),
+        struct.pack(f"<{n}q", *codes),
+        struct.pack(f"<{n}i", *by_code),
+        b"\x00" * (_align(4 * n) - 4 * n),
+        struct.pack(f"<{n + 1}q", *name_offsets),
+        struct.pack(f"<{n + 1}q", *lower_offsets),
+        names_buf,
+        lower_buf,
+    ]
+    return b"".join(parts)
+
+
+def publish(schemes: dict, path: str = CATALOG_PATH) -> int:
+    """Writes the catalog next to `path` and renames it into place."""
+    data = pack(schemes)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(data)
+
+
+# ---------------------------
+# Read-only view
+# ---------------------------
+class SchemeCatalog:
+    def __init__(self, buf, source=None):
+        self._buf = buf
+        self._source = source
+        magic, n, names_len, lower_len, built_at = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a scheme catalog file")
+        self.size = n
+        self.built_at = built_at
+
+        view = memoryview(buf)
+        pos = _HEADER.size
+        self.codes = view[pos:pos + 8 * n].cast("q")
+        pos += 8 * n
+        self.by_code = view[pos:pos + 4 * n].cast("i")
+        pos += _align(4 * n)
+        self.name_offsets = view[pos:pos + 8 * (n + 1)].cast("q")
+        pos += 8 * (n + 1)
+        self.lower_offsets = view[pos:pos + 8 * (n + 1)].cast("q")
+        pos += 8 * (n + 1)
+        self._names_start = pos
+        self._lower_start = pos + names_len
+        self._lower_end = self._lower_start + lower_len
+
+    @classmethod
+    def attach(cls, path: str = CATALOG_PATH) -> "SchemeCatalog":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, source=os.stat(path))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def name(self, i: int) -> str:
+        start = self._names_start + self.name_offsets[i]
+        end = self._names_start + self.name_offsets[i + 1]
+        return self._buf[start:end].decode("utf-8")
+
+    def row(self, i: int) -> dict:
+        return {"code": str(self.codes[i]), "name": self.name(i)}
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> list[dict]:
+        stop = self.size if stop is None else min(stop, self.size)
+        return [self.row(i) for i in range(start, stop)]
+
+    def index_of(self, code) -> Optional[int]:
+        # same canonical form pack() keeps, so "0119551" isn't 119551
+        code = str(code).strip()
+        if not code.isdigit() or str(int(code)) != code:
+            return None
+        code = int(code)
+        codes = self.codes
+        k = bisect.bisect_left(self.by_code, code, key=codes.__getitem__)
+        if k < self.size and codes[self.by_code[k]] == code:
+            return self.by_code[k]
+        return None
+
+    def _find(self, needle: bytes, limit: Optional[int]) -> list[int]:
+        """Rows whose lowered name contains `needle`, in catalog order."""
+        found = []
+        buf, base, end = self._buf, self._lower_start, self._lower_end
+        offsets = self.lower_offsets
+        pos = base
+        while limit is None or len(found) < limit:
+            hit = buf.find(needle, pos, end)
+            if hit < 0:
+                break
+            # +1 so a hit on the NUL before a name maps to that name
+            i = bisect.bisect_right(offsets, hit - base + 1) - 1
+            found.append(i)
+            # resume at the NUL in front of the next name
+            pos = base + offsets[i + 1] - 1
+        return found
+
+    def search(self, q: str, limit: Optional[int] = 10) -> list[dict]:
+        needle = q.lower().encode("utf-8")
+        if b"\x00" in needle:
+            return []
+        if not needle:
+            return self.rows(0, limit)
+        return [self.row(i) for i in self._find(needle, limit)]
+
+    def starting_with(self, prefix: str, limit: Optional[int] = None) -> list[dict]:
+        needle = prefix.lower().encode("utf-8")
+        if not needle or b"\x00" in needle:
+            return []
+        return [self.row(i) for i in self._find(b"\x00" + needle, limit)]
+
+
+# ---------------------------
+# Publish-once / attach-everywhere
+# ---------------------------
+def _is_fresh(path: str) -> bool:
+    try:
+        return time.time() - os.stat(path).st_mtime <= CATALOG_MAX_AGE
+    except FileNotFoundError:
+        return False
+
+
+def ensure_published(path: str = CATALOG_PATH, force: bool = False) -> bool:
+    """
+    Builds and publishes the catalog unless a fresh one already exists.
+    An exclusive lock file makes sure only one worker downloads the scheme
+    list; the others wait and then attach what it wrote.
+    """
+    if not force and _is_fresh(path):
+        return False
+    with open(f"{path}.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not force and _is_fresh(path):
+                return False
+            from app.funds import fresh_scheme_codes
+
+            size = publish(fresh_scheme_codes(), path)
+            print(f"✅ Scheme catalog published to {path} ({size / 1024:.0f} KiB)")
+            return True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+_catalog: Optional[SchemeCatalog] = None
+_checked_at = 0.0
+
+
+def load_catalog(path: str = CATALOG_PATH) -> SchemeCatalog:
+    global _catalog, _checked_at
+    try:
+        ensure_published(path)
+    except Exception as e:
+        # a stale catalog beats no catalog
+        if not os.path.exists(path):
+            raise
+        print(f"⚠️ Scheme catalog refresh failed, serving the existing one: {e}")
+    st = os.stat(path)
+    current = _catalog
+    if current is None or (current._source.st_ino, current._source.st_mtime) != (st.st_ino, st.st_mtime):
+        # the old mapping stays valid for requests still holding it
+        _catalog = SchemeCatalog.attach(path)
+    _checked_at = time.monotonic()
+    return _catalog
+
+
+def attached() -> Optional[SchemeCatalog]:
+    """The catalog this worker has mapped, if any; never builds or re-checks."""
+    return _catalog
+
+
+async def get_catalog() -> SchemeCatalog:
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _checked_at <= CATALOG_RECHECK:
+        return catalog
+    # publishing may download the scheme list, keep it off the event loop
+    return await asyncio.to_thread(load_catalog)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish the shared scheme catalog")
+    parser.add_argument("--path", default=CATALOG_PATH)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the file is fresh")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    ensure_published(args.path, force=args.force)
+    catalog = SchemeCatalog.attach(args.path)
+    print(f"{len(catalog)} schemes, {os.path.getsize(args.path) / 1024:.0f} KiB, {time.perf_counter() - t0:.2f}s")
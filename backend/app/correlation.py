@@ -0,0 +1,469 @@
+# app/correlation.py
+# Return-correlation between schemes:
+#   - /matrix   pairwise correlation for a requested set of schemes, from
+#               NAV histories aligned on their common dates
+#   - /similar  top-k most correlated schemes for one scheme, answered from
+#               a precomputed index built from the nav_history table
+# Matrices are cached per NAV version: the latest NAV date the published
+# index was built from, so every worker agrees on it (today's date until an
+# index has been published).
+#
+# The similarity index is built once, by the process running the NAV refresh
+# (after every run) or by `python -m app.correlation`, and published as one
+# flat file:
+#
+#   header | codes S20[n] | neighbours int32[n, k] | scores float32[n, k]
+#          | name offsets int64[n + 1] | names (UTF-8)
+#
+# Web workers only mmap it (like the scheme catalog), so they never hold the
+# build's working set and never build in the request path.
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from sqlalchemy import Float, cast, func, select
+
+from app import nav_refresh, upstream
+from app.database import AsyncSessionLocal
+from app.fundDetail import _parse_nav_arrays
+from app.models import MutualFund, NavHistory
+
+if TYPE_CHECKING:
+    import numpy as np
+
+router = APIRouter()
+
+BASE_URL = "https://api.mfapi.in/mf"
+MAX_MATRIX_CODES = 50
+MATRIX_CACHE_SIZE = 256
+SIMILAR_WINDOW_DAYS = int(os.getenv("SIMILAR_WINDOW_DAYS", "365"))
+SIMILAR_TOP_K = 50
+SIMILAR_MIN_COVERAGE = 0.8  # share of window days a scheme must have NAVs for
+SIMILAR_INDEX_PATH = os.getenv(
+    "SIMILAR_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "..", ".similar_index.bin"),
+)
+SIMILAR_INDEX_RECHECK = float(os.getenv("SIMILAR_INDEX_RECHECK", "60"))
+# rows of the schemes x schemes product computed at a time; each block holds
+# a few (SIMILAR_BLOCK x schemes) float32 temporaries
+SIMILAR_BLOCK = int(os.getenv("SIMILAR_BLOCK", "512"))
+
+_matrix_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+
+
+def nav_version() -> str:
+    index = get_index()
+    return index.version if index is not None else date.today().isoformat()
+
+
+# ---------- Return matrices ----------
+def aligned_returns(series: list[tuple[np.ndarray, np.ndarray]], days: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aligns (dates, navs) pairs on the dates they all share within the last
+    `days` days and returns (common_dates, daily_returns[T - 1, N]).
+    """
+    import numpy as np
+
+    end = min(d[-1] for d, _ in series)
+    start = end - np.timedelta64(days, "D")
+    common = None
+    for d, _ in series:
+        window = d[(d >= start) & (d <= end)]
+        common = window if common is None else np.intersect1d(common, window, assume_unique=True)
+
+    prices = np.empty((len(common), len(series)), dtype=np.float64)
+    for j, (d, navs) in enumerate(series):
+        prices[:, j] = navs[np.searchsorted(d, common)]
+    return common, prices[1:] / prices[:-1] - 1.0
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.corrcoef(returns, rowvar=False)
+
+
+async def _fetch_series(code: str) -> tuple[np.ndarray, np.ndarray]:
+    import numpy as np
+
+    payload = await upstream.fetch_json(f"{BASE_URL}/{code}")
+    history = payload.get("data", [])
+    if not history:
+        raise HTTPException(status_code=502, detail=f"No NAV history from upstream for {code}")
+    dates, navs = _parse_nav_arrays(history)
+    if not len(dates):
+        raise HTTPException(status_code=502, detail=f"No valid NAV rows from upstream for {code}")
+    # duplicate dates would break the alignment, keep the last of each
+    last = np.ones(len(dates), dtype=bool)
+    last[:-1] = dates[1:] != dates[:-1]
+    return dates[last], navs[last]
+
+
+@router.get("/matrix")
+async def get_correlation_matrix(
+    codes: str = Query(..., description="Comma separated scheme codes"),
+    days: int = Query(365, ge=30, le=3650, description="Look-back window in days"),
+):
+    import numpy as np
+
+    scheme_codes = list(dict.fromkeys(c.strip() for c in codes.split(",") if c.strip()))
+    if len(scheme_codes) < 2:
+        raise HTTPException(status_code=400, detail="Provide at least two scheme codes")
+    if len(scheme_codes) > MAX_MATRIX_CODES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MATRIX_CODES} scheme codes per request")
+
+    key = (tuple(sorted(scheme_codes)), days, nav_version())
+    cached = _matrix_cache.get(key)
+    if cached is not None:
+        _matrix_cache.move_to_end(key)
+        return cached
+
+    try:
+        series = await asyncio.gather(*(_fetch_series(c) for c in scheme_codes))
+    except HTTPException:
+        raise
+    except upstream.UpstreamHTTPError as exc:
+        if exc.status_code == 404:
+            raise HTTPException(status_code=404, detail="One or more scheme codes not found")
+        raise HTTPException(status_code=502, detail=exc.detail)
+    except upstream.UpstreamUnavailable as exc:
+        raise HTTPException(status_code=503, detail=f"Error contacting external API: {exc.detail}")
+    except ValueError as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+
+    common, returns = aligned_returns(series, days)
+    if len(returns) < 20:
+        raise HTTPException(status_code=400, detail="Not enough overlapping NAV history to correlate these schemes")
+    corr = correlation_matrix(returns)
+
+    # cache in sorted-code order, independent of request order
+    order = sorted(range(len(scheme_codes)), key=lambda i: scheme_codes[i])
+    corr = corr[np.ix_(order, order)]
+    result = {
+        "codes": [scheme_codes[i] for i in order],
+        "matrix": [[None if not np.isfinite(v) else round(float(v), 4) for v in row] for row in corr],
+        "observations": int(len(returns)),
+        "from": str(common[0]),
+        "to": str(common[-1]),
+        "nav_version": key[2],
+    }
+    _matrix_cache[key] = result
+    while len(_matrix_cache) > MATRIX_CACHE_SIZE:
+        _matrix_cache.popitem(last=False)
+    return result
+
+
+# ---------- Similar-funds index ----------
+MAGIC = b"MFSIM001"
+CODE_DTYPE = "S20"  # mutualfunds.scheme_code is String(20)
+# magic, schemes, k, names bytes, built_at, nav version
+_HEADER = struct.Struct("<8sQQQd32s")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class SimilarityIndex:
+    """Read-only view over a published index file (or any buffer in its layout)."""
+
+    def __init__(self, buf, source=None):
+        import numpy as np
+
+        magic, n, k, names_len, built_at, version = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a similarity index file")
+        self._buf = buf
+        self.source = source
+        self.size = n
+        self.k = k
+        self.built_at = built_at
+        self.version = version.rstrip(b"\x00").decode()
+
+        pos = _HEADER.size
+        self.codes = np.frombuffer(buf, dtype=CODE_DTYPE, count=n, offset=pos)
+        pos += _align(20 * n)
+        self.neighbors = np.frombuffer(buf, dtype=np.int32, count=n * k, offset=pos).reshape(n, k)
+        pos += _align(4 * n * k)
+        self.scores = np.frombuffer(buf, dtype=np.float32, count=n * k, offset=pos).reshape(n, k)
+        pos += _align(4 * n * k)
+        self._name_offsets = np.frombuffer(buf, dtype=np.int64, count=n + 1, offset=pos)
+        self._names_start = pos + 8 * (n + 1)
+
+    @classmethod
+    def attach(cls, path: str = SIMILAR_INDEX_PATH) -> "SimilarityIndex":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, source=os.stat(path))
+
+    def position(self, code: str) -> Optional[int]:
+        import numpy as np
+
+        key = code.encode()
+        i = int(np.searchsorted(self.codes, key))
+        if i < self.size and self.codes[i] == key:
+            return i
+        return None
+
+    def code(self, i: int) -> str:
+        return self.codes[i].decode()
+
+    def name(self, i: int) -> Optional[str]:
+        start, end = self._name_offsets[i], self._name_offsets[i + 1]
+        if start == end:
+            return None
+        return bytes(self._buf[self._names_start + start:self._names_start + end]).decode("utf-8")
+
+    def similar(self, code: str, k: int) -> Optional[list[dict]]:
+        i = self.position(code)
+        if i is None:
+            return None
+        out = []
+        for j, score in zip(self.neighbors[i, :k].tolist(), self.scores[i, :k].tolist()):
+            out.append({"code": self.code(j), "name": self.name(j), "correlation": round(score, 4)})
+        return out
+
+
+def build_index(codes: np.ndarray, dates: np.ndarray, navs: np.ndarray, top_k: int = SIMILAR_TOP_K):
+    """
+    codes/dates/navs are parallel arrays of nav_history rows. Builds a
+    (days x schemes) price matrix, standardizes daily returns per scheme and
+    takes top-k neighbours from Z.T @ Z in blocks of SIMILAR_BLOCK schemes,
+    so the full schemes x schemes matrix is never materialized.
+    """
+    import numpy as np
+
+    scheme_ids, col = np.unique(codes, return_inverse=True)
+    day_ids, row = np.unique(dates, return_inverse=True)
+    prices = np.full((len(day_ids), len(scheme_ids)), np.nan)
+    prices[row, col] = navs
+    del row, col
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets = prices[1:] / prices[:-1] - 1.0
+    del prices
+    coverage = np.isfinite(rets).mean(axis=0)
+    keep = coverage >= SIMILAR_MIN_COVERAGE
+    rets = rets[:, keep]
+    scheme_ids = scheme_ids[keep]
+
+    valid = np.isfinite(rets)
+    n_obs = valid.sum(axis=0)
+    mean = np.where(valid, rets, 0.0).sum(axis=0) / np.maximum(n_obs, 1)
+    centered = np.where(valid, rets - mean, 0.0)
+    del rets
+    std = np.sqrt((centered ** 2).sum(axis=0) / np.maximum(n_obs - 1, 1))
+    usable = std > 0
+    # missing days contribute 0 to Z.T @ Z; divide by the pairwise overlap instead of T
+    z = (centered[:, usable] / std[usable]).astype(np.float32)
+    mask = valid[:, usable].astype(np.float32)
+    scheme_ids = scheme_ids[usable]
+    del centered, valid
+
+    n = z.shape[1]
+    k = min(top_k, n - 1)
+    if k <= 0:
+        return scheme_ids, np.empty((n, 0), dtype=np.int32), np.empty((n, 0), dtype=np.float32)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, SIMILAR_BLOCK):
+        stop = min(start + SIMILAR_BLOCK, n)
+        # both blocks are (stop - start, n) float32; everything else is done in place
+        overlap = mask[:, start:stop].T @ mask
+        block = z[:, start:stop].T @ z
+        with np.errstate(invalid="ignore", divide="ignore"):
+            np.divide(block, overlap - 1, out=block)
+        block[overlap < 20] = -np.inf
+        del overlap
+        block[np.isnan(block)] = -np.inf
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # drop self
+        top = np.argpartition(block, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        del block
+        order = np.argsort(-top_scores, axis=1)
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.clip(np.take_along_axis(top_scores, order, axis=1), -1.0, 1.0)
+    return scheme_ids, neighbors, scores
+
+
+def pack_index(scheme_ids: np.ndarray, neighbors: np.ndarray, scores: np.ndarray, names: dict[str, str], version: str) -> bytes:
+    import numpy as np
+
+    codes = np.asarray(scheme_ids).astype(CODE_DTYPE)
+    order = np.argsort(codes, kind="stable")
+    if not np.array_equal(order, np.arange(len(codes))):
+        # keep codes sorted for the binary search, remapping neighbour ids
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        codes, neighbors, scores = codes[order], rank[neighbors[order]], scores[order]
+
+    n, k = neighbors.shape
+    encoded = [(names.get(c) or "").encode("utf-8") for c in codes.astype(str).tolist()]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    names_buf = b"".join(encoded)
+
+    def padded(a: np.ndarray) -> bytes:
+        raw = a.tobytes()
+        return raw + b"\x00" * (_align(len(raw)) - len(raw))
+
+    return b"".join([
+        _HEADER.pack(MAGIC, n, k, len(names_buf), time.time(), version.encode()[:32]),
+        padded(codes),
+        padded(neighbors.astype(np.int32)),
+        padded(scores.astype(np.float32)),
+        offsets.tobytes(),
+        names_buf,
+    ])
+
+
+def _publish_file(data: bytes, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _to_arrays(rows: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    import numpy as np
+
+    c, d, v = zip(*rows)
+    return np.array(c), np.array(d, dtype="datetime64[D]"), np.array(v, dtype=np.float64)
+
+
+async def _load_window() -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, str]]:
+    import numpy as np
+
+    async with AsyncSessionLocal() as session:
+        last = await session.scalar(select(func.max(NavHistory.nav_date)))
+        if last is None:
+            return np.array([]), np.array([], dtype="datetime64[D]"), np.array([]), {}
+        cutoff = last - timedelta(days=SIMILAR_WINDOW_DAYS)
+
+        parts = []
+        stream = await session.stream(
+            select(NavHistory.scheme_code, NavHistory.nav_date, cast(NavHistory.nav, Float))
+            .where(NavHistory.nav_date >= cutoff)
+        )
+        async for chunk in stream.partitions(100_000):
+            # building arrays from 100k row tuples is CPU bound
+            parts.append(await asyncio.to_thread(_to_arrays, chunk))
+
+        names_result = await session.execute(select(MutualFund.scheme_code, MutualFund.name))
+        names = {code: name for code, name in names_result.all() if code}
+
+    if not parts:
+        return np.array([]), np.array([], dtype="datetime64[D]"), np.array([]), names
+    codes, dates, navs = zip(*parts)
+    return np.concatenate(codes), np.concatenate(dates), np.concatenate(navs), names
+
+
+def _build_and_publish(codes, dates, navs, names: dict[str, str], version: str, path: str) -> int:
+    scheme_ids, neighbors, scores = build_index(codes, dates, navs)
+    data = pack_index(scheme_ids, neighbors, scores, names, version)
+    _publish_file(data, path)
+    return len(scheme_ids)
+
+
+async def publish_index(path: str = SIMILAR_INDEX_PATH) -> Optional[int]:
+    """
+    Builds the index from the last SIMILAR_WINDOW_DAYS of nav_history and
+    publishes it to `path`. Run by the NAV refresh process and the CLI, never
+    by a request. Returns the number of indexed schemes.
+    """
+    codes, dates, navs, names = await _load_window()
+    if not len(codes):
+        return None
+    version = str(dates.max())
+    t0 = time.perf_counter()
+    n = await asyncio.to_thread(_build_and_publish, codes, dates, navs, names, version, path)
+    print(f"✅ Similarity index published to {path} ({n} schemes, {time.perf_counter() - t0:.1f}s)")
+    return n
+
+
+_index: Optional[SimilarityIndex] = None
+_checked_at = 0.0
+
+
+def load_index(path: str = SIMILAR_INDEX_PATH) -> Optional[SimilarityIndex]:
+    """Attaches the published index, re-attaching when the file was replaced."""
+    global _index, _checked_at
+    _checked_at = time.monotonic()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        # keep serving an index that was attached before the file went away
+        return _index
+    current = _index
+    if current is None or (current.source.st_ino, current.source.st_mtime) != (st.st_ino, st.st_mtime):
+        # the old mapping stays valid for requests still holding it
+        _index = SimilarityIndex.attach(path)
+    return _index
+
+
+def get_index() -> Optional[SimilarityIndex]:
+    # a stat every SIMILAR_INDEX_RECHECK seconds picks up a newly published file
+    if _checked_at and time.monotonic() - _checked_at <= SIMILAR_INDEX_RECHECK:
+        return _index
+    return load_index()
+
+
+async def on_refresh_complete(summary: dict) -> None:
+    await publish_index()
+    load_index()
+
+
+nav_refresh.run_hooks.append(on_refresh_complete)
+
+
+@router.get("/similar/{scheme_code}")
+async def get_similar_funds(
+    scheme_code: str = Path(..., description="Mutual fund scheme code"),
+    k: int = Query(10, ge=1, le=SIMILAR_TOP_K),
+):
+    index = get_index()
+    if index is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Similarity index is not available yet; it is built after a NAV refresh or by `python -m app.correlation`",
+        )
+    similar = index.similar(scheme_code, k)
+    if similar is None:
+        raise HTTPException(status_code=404, detail=f"Not enough NAV history to compare scheme {scheme_code}")
+    return {
+        "scheme_code": scheme_code,
+        "scheme_name": index.name(index.position(scheme_code)),
+        "similar": similar,
+        "window_days": SIMILAR_WINDOW_DAYS,
+        "nav_version": index.version,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and publish the similar-funds index")
+    parser.add_argument("--path", default=SIMILAR_INDEX_PATH)
+    args = parser.parse_args()
+
+    async def _main():
+        try:
+            if await publish_index(args.path) is None:
+                print("⚠️ nav_history is empty, nothing to index")
+        finally:
+            from app.database import engine
+            await engine.dispose()
+
+    asyncio.run(_main())
@@ -1,24 +1,154 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING
+
 from fastapi import APIRouter, Path, HTTPException
-import httpx
-import pandas as pd
-import numpy as np
+
+from app import upstream
+
+# numpy is imported inside the functions that use it so that importing
+# this router (and therefore app.main) stays cheap.
+if TYPE_CHECKING:
+    import numpy as np
 
 router = APIRouter()
 
-# ---------- Helpers for risk ----------
-def _parse_nav_series(history: list[dict]) -> pd.Series:
-    # MFAPI.in returns latest-first: [{"date":"DD-MM-YYYY","nav":"123.45"}, ...]
-    df = pd.DataFrame(history)
-    if df.empty or "nav" not in df or "date" not in df:
+# ---------- Helpers for NAV parsing ----------
+# mfapi.in returns latest-first: [{"date": "DD-MM-YYYY", "nav": "123.45"}, ...]
+# These parse it straight into arrays (no DataFrame), with the same results
+# as the former pandas version: rows with an unparseable date or nav are
+# dropped and the output is oldest first.
+_DATE_WIDTH = 10  # "DD-MM-YYYY"
+# the range pandas' nanosecond timestamps could hold; dates outside it were NaT
+_DATE_MIN, _DATE_MAX = "1677-09-22", "2262-04-11"
+
+
+def _parse_nav_dates(dates: list) -> np.ndarray:
+    """DD-MM-YYYY strings -> datetime64[D]; anything unparseable becomes NaT."""
+    import numpy as np
+
+    n = len(dates)
+    # One ASCII buffer with a comma after every date; if the commas sit
+    # exactly every 11 bytes, every date was a 10-character string.
+    chars = None
+    try:
+        raw = (",".join(dates) + ",").encode("ascii")
+        if raw.count(b",") == n and len(raw) == n * (_DATE_WIDTH + 1):
+            chars = np.frombuffer(raw, dtype=np.uint8).reshape(n, _DATE_WIDTH + 1)
+            if not (chars[:, _DATE_WIDTH] == ord(",")).all():
+                chars = None
+    except (TypeError, UnicodeEncodeError):
+        pass
+    if chars is None:
+        raw = ",".join(
+            d if isinstance(d, str) and len(d) == _DATE_WIDTH and d.isascii() and "," not in d else "00-00-0000"
+            for d in dates
+        ).encode("ascii") + b","
+        chars = np.frombuffer(raw, dtype=np.uint8).reshape(n, _DATE_WIDTH + 1)
+
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9]].astype(np.int64) - ord("0")
+    ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    ok &= (chars[:, 2] == ord("-")) & (chars[:, 5] == ord("-"))
+    day = digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    ok &= (month >= 1) & (month <= 12) & (day >= 1)
+
+    months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype("datetime64[M]")
+    out = months.astype("datetime64[D]") + np.where(ok, day - 1, 0)
+    # days past the end of their month (31-02-2024) roll over, reject them
+    ok &= out.astype("datetime64[M]") == months
+    out[~ok] = np.datetime64("NaT")
+
+    # whatever the fast path rejected gets strptime's verdict (unpadded days, ...)
+    for i in np.flatnonzero(~ok).tolist():
+        try:
+            out[i] = datetime.strptime(dates[i], "%d-%m-%Y").date()
+        except (TypeError, ValueError):
+            pass
+    out[(out < np.datetime64(_DATE_MIN)) | (out > np.datetime64(_DATE_MAX))] = np.datetime64("NaT")
+    return out
+
+
+def _parse_nav_values(navs: list) -> np.ndarray:
+    """
+    NAVs -> float64, NaN wherever pd.to_numeric(errors="coerce") gave NaN.
+    float() is more lenient than pandas' parser, so strings with underscores
+    or non-ASCII characters ("1_000", "١٢٣") and finite numbers that
+    overflow to inf ("1e400") are rejected here. One difference is left:
+    pandas read a string only up to an embedded NUL, here that is NaN.
+    """
+    import numpy as np
+
+    def lenient(v) -> bool:
+        return isinstance(v, str) and ("_" in v or not v.isascii())
+
+    try:
+        # mfapi.in sends strings only; one join checks them all at C speed
+        text = "".join(navs)
+        strict = "_" in text or not text.isascii()
+    except TypeError:
+        strict = any(map(lenient, navs))
+
+    out = None
+    if not strict:
+        try:
+            out = np.array(navs, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    if out is None:
+        out = np.full(len(navs), np.nan)
+        for i, v in enumerate(navs):
+            if lenient(v):
+                continue
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+    for i in np.flatnonzero(np.isinf(out)).tolist():
+        v = navs[i]
+        if isinstance(v, str) and v.lower().lstrip("+-") not in ("inf", "infinity"):
+            out[i] = np.nan
+    return out
+
+
+def _parse_nav_arrays(history: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """(dates datetime64[D], navs float64), oldest first."""
+    import numpy as np
+
+    if not history:
         raise ValueError("Invalid NAV history format")
-    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
-    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-    df = df.dropna(subset=["date", "nav"]).sort_values("date")
-    return pd.Series(df["nav"].values, index=df["date"])
+    dates = [row.get("date") for row in history]
+    navs = [row.get("nav") for row in history]
+    if all(d is None for d in dates) or all(v is None for v in navs):
+        raise ValueError("Invalid NAV history format")
+
+    d = _parse_nav_dates(dates)
+    v = _parse_nav_values(navs)
+    keep = ~np.isnat(d) & ~np.isnan(v)
+    if not keep.all():
+        d, v = d[keep], v[keep]
+
+    # mfapi.in is latest-first, so a reverse is usually all the sorting needed
+    step = np.diff(d.astype(np.int64))
+    if (step < 0).all():
+        return d[::-1].copy(), v[::-1].copy()
+    if (step > 0).all():
+        return d, v
+    # same call pandas' sort_values made, so rows sharing a date keep its order
+    order = d.astype("datetime64[ns]").argsort(kind="quicksort")
+    return d[order], v[order]
 
 
-def _riskometer_from_nav(navs: pd.Series, freq: str = "D") -> dict:
-    rets = navs.pct_change().dropna()
+# ---------- Helpers for risk ----------
+def _risk_metrics(navs: np.ndarray, freq: str = "D") -> tuple[float, float, float]:
+    """(volatility %, downside deviation %, max drawdown %), annualized."""
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = navs[1:] / navs[:-1] - 1
     if len(rets) < 10:
         raise ValueError("Insufficient NAV history to compute risk")
     ann_factor = 252 if freq == "D" else 12
@@ -31,9 +161,14 @@ def _riskometer_from_nav(navs: pd.Series, freq: str = "D") -> dict:
     dd = np.sqrt((downside ** 2).sum() / len(rets)) * np.sqrt(ann_factor) * 100
 
     # Max drawdown (%)
-    cum = (1 + rets).cumprod()
-    running_max = cum.cummax()
+    cum = np.cumprod(1 + rets)
+    running_max = np.maximum.accumulate(cum)
     mdd = ((cum - running_max) / running_max).min() * 100
+    return float(vol), float(dd), float(mdd)
+
+
+def _risk_result(vol: float, dd: float, mdd: float) -> dict:
+    import numpy as np
 
     # Normalize to 0-100
     def norm(v, lo, hi):
@@ -69,40 +204,48 @@ def _riskometer_from_nav(navs: pd.Series, freq: str = "D") -> dict:
     }
 
 
+def _riskometer_from_nav(navs: np.ndarray, freq: str = "D") -> dict:
+    """Risk score / category from an oldest-first array of NAVs."""
+    return _risk_result(*_risk_metrics(navs, freq))
+
+
 @router.get("/{scheme_code}")
-def get_mutual_fund_risk(
+async def get_mutual_fund_risk(
     scheme_code: str = Path(..., description="Mutual fund scheme code")
 ):
     url = f"https://api.mfapi.in/mf/{scheme_code}"
     try:
-        response = httpx.get(url, timeout=20.0)
-        if response.status_code == 404:
-            raise HTTPException(status_code=404, detail=f"Mutual fund with code {scheme_code} not found")
-        response.raise_for_status()
-        payload = response.json()
+        payload = await upstream.fetch_json(url, timeout=20.0)
         history = payload.get("data", [])
         if not history:
             raise HTTPException(status_code=502, detail="No NAV history from upstream")
 
-        series = _parse_nav_series(history)
-        risk = _riskometer_from_nav(series, freq="D")
+        _, navs = _parse_nav_arrays(history)
+        risk = _riskometer_from_nav(navs, freq="D")
 
         # CHANGE: pick first element (latest) instead of assigning the whole list
         latest = history[0]  # was: latest = history
 
-        latest_nav = pd.to_numeric(latest.get("nav", "nan"), errors="coerce")
+        # parsed exactly like the history (pd.to_numeric(..., errors="coerce") before)
+        latest_nav = float(_parse_nav_values([latest.get("nav")])[0])
+        if math.isnan(latest_nav):
+            latest_nav = None
         return {
             "scheme_code": scheme_code,
             "scheme_name": payload.get("meta", {}).get("scheme_name"),
             "as_of": latest.get("date"),
-            "latest_nav": None if pd.isna(latest_nav) else float(latest_nav),
+            "latest_nav": latest_nav,
             "risk": risk,
             "source": "api.mfapi.in",
             "disclaimer": "Computed from historical NAV; not the official SEBI/AMFI Riskometer.",
         }
     except HTTPException:
         raise
-    except httpx.RequestError as exc:
-        raise HTTPException(status_code=503, detail=f"Error contacting external API: {exc}")
+    except upstream.UpstreamHTTPError as exc:
+        if exc.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Mutual fund with code {scheme_code} not found")
+        raise HTTPException(status_code=502, detail=exc.detail)
+    except upstream.UpstreamUnavailable as exc:
+        raise HTTPException(status_code=503, detail=f"Error contacting external API: {exc.detail}")
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Processing error: {exc}")
@@ -0,0 +1,114 @@
+# app/fund_page.py
+# Everything the fund page needs in one call:
+#
+#   GET /api/funds/page/{scheme_code}?include=details,history,risk
+#
+# The mfapi.in history is downloaded once (it is also what mftool's
+# get_scheme_details fetches). The display name comes from the shared scheme
+# catalog when this worker already has it attached; the page never waits on
+# a catalog build (that downloads the AMFI scheme list) and falls back to the
+# upstream scheme name. The history is parsed once and the same series feeds
+# the chart data and the risk computation.
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import JSONResponse
+
+from app import catalog, upstream
+from app.fundDetail import _parse_nav_arrays, _riskometer_from_nav
+
+router = APIRouter()
+
+BASE_URL = "https://api.mfapi.in/mf"
+PARTS = ("details", "history", "risk")
+RISK_DISCLAIMER = "Computed from historical NAV; not the official SEBI/AMFI Riskometer."
+
+
+def _details(payload: dict) -> dict:
+    # same fields as Mftool.get_scheme_details()
+    meta = payload.get("meta") or {}
+    history = payload.get("data") or []
+    return {
+        "fund_house": meta.get("fund_house"),
+        "scheme_type": meta.get("scheme_type"),
+        "scheme_category": meta.get("scheme_category"),
+        "scheme_code": meta.get("scheme_code"),
+        "scheme_name": meta.get("scheme_name"),
+        "scheme_start_date": history[-1] if history else None,
+    }
+
+
+def _series_parts(history: list[dict], want_history: bool, want_risk: bool) -> dict:
+    """Parses the history once and derives the chart data and risk from it."""
+    import numpy as np
+
+    dates, navs = _parse_nav_arrays(history)
+    parts = {}
+    # YYYY-MM-DD -> DD-MM-YYYY, the format /nav_history returns
+    iso = np.datetime_as_string(dates if want_history else dates[-1:]).tolist()
+    labels = [f"{d[8:10]}-{d[5:7]}-{d[:4]}" for d in iso]
+    if want_history:
+        parts["nav_history"] = [{"date": d, "nav": v} for d, v in zip(labels, navs.tolist())]
+    if want_risk:
+        try:
+            parts["risk"] = _riskometer_from_nav(navs, freq="D")
+        except ValueError as e:
+            parts["risk"] = None
+            parts["risk_error"] = str(e)
+    if len(navs):
+        parts["latest"] = {"date": labels[-1], "nav": float(navs[-1])}
+    return parts
+
+
+def _catalog_name(scheme_code: str) -> Optional[str]:
+    schemes = catalog.attached()
+    if schemes is None:
+        return None
+    i = schemes.index_of(scheme_code)
+    return None if i is None else schemes.name(i)
+
+
+@router.get("/page/{scheme_code}")
+async def get_fund_page(
+    scheme_code: str = Path(..., description="Mutual fund scheme code"),
+    include: str = Query(",".join(PARTS), description="Comma-separated parts: details, history, risk"),
+):
+    wanted = {p.strip() for p in include.split(",") if p.strip()}
+    unknown = wanted - set(PARTS)
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=400,
+            detail=f"include must be a comma-separated subset of {', '.join(PARTS)}",
+        )
+
+    try:
+        payload = await upstream.fetch_json(f"{BASE_URL}/{scheme_code}", timeout=20.0)
+        history = payload.get("data") or []
+        if not history:
+            raise HTTPException(status_code=502, detail="No NAV history from upstream")
+
+        page = {
+            "scheme_code": scheme_code,
+            "name": _catalog_name(scheme_code) or (payload.get("meta") or {}).get("scheme_name"),
+        }
+        if "details" in wanted:
+            page["details"] = _details(payload)
+        # parsing and the risk math are CPU bound, keep them off the event loop
+        page.update(await asyncio.to_thread(_series_parts, history, "history" in wanted, "risk" in wanted))
+        if "risk" in wanted:
+            page["risk_disclaimer"] = RISK_DISCLAIMER
+        page["source"] = "api.mfapi.in"
+        # plain JSON types only, so skip jsonable_encoder (the slow part for
+        # a few thousand history rows)
+        return JSONResponse(page)
+    except HTTPException:
+        raise
+    except upstream.UpstreamHTTPError as exc:
+        if exc.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Mutual fund with code {scheme_code} not found")
+        raise HTTPException(status_code=502, detail=exc.detail)
+    except upstream.UpstreamUnavailable as exc:
+        raise HTTPException(status_code=503, detail=f"Error contacting external API: {exc.detail}")
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Processing error: {exc}")
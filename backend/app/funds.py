@@ -1,10 +1,29 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Query, HTTPException, Request
-import httpx
-from mftool import Mftool
+from . import catalog, upstream
 from .nav_history import router as nav_history_router
+from .fund_page import router as fund_page_router
 
 router = APIRouter()
-mf = Mftool()
+
+
+# ---------------------------
+# Lazily constructed Mftool client
+# ---------------------------
+@lru_cache(maxsize=1)
+def get_mf():
+    # Mftool() downloads the full AMFI scheme list on construction, so it is
+    # built on first use (or during warm-up) instead of at import time.
+    from mftool import Mftool
+    return Mftool()
+
+
+def fresh_scheme_codes() -> dict:
+    # get_mf() keeps its scheme list for 7 days; jobs that rebuild from the
+    # list download it again with a throwaway client, freed once they return
+    from mftool import Mftool
+    return Mftool().get_scheme_codes()
 
 # ---------------------------
 # Ping Mftool to check if it's working
@@ -12,7 +31,7 @@ mf = Mftool()
 @router.get("/ping-mf")
 async def ping_mftool():
     try:
-        schemes = mf.get_scheme_codes()
+        schemes = get_mf().get_scheme_codes()
         return {"status": "ok", "schemes_count": len(schemes)}
     except Exception as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -24,14 +43,10 @@ async def ping_mftool():
 @router.get("/names")
 async def get_mutual_fund_names(page: int = Query(1, ge=1)):
     try:
-        all_scheme_codes = mf.get_scheme_codes()
-        funds = [
-            {"code": code, "name": name.replace("Scheme", "").strip()}
-            for code, name in all_scheme_codes.items()
-        ]
+        schemes = await catalog.get_catalog()
 
         page_size = 20
-        total_count = len(funds)
+        total_count = len(schemes)
         total_pages = (total_count + page_size - 1) // page_size
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
@@ -40,7 +55,7 @@ async def get_mutual_fund_names(page: int = Query(1, ge=1)):
             raise HTTPException(status_code=400, detail="Page number out of range")
 
         return {
-            "funds": funds[start_idx:end_idx],
+            "funds": schemes.rows(start_idx, end_idx),
             "total_count": total_count,
             "total_pages": total_pages,
             "page": page,
@@ -55,7 +70,7 @@ async def get_mutual_fund_names(page: int = Query(1, ge=1)):
 @router.get("/details/{scheme_code}")
 async def get_fund_details(scheme_code: str):
     try:
-        details = mf.get_scheme_details(scheme_code)
+        details = get_mf().get_scheme_details(scheme_code)
         return details
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -71,9 +86,7 @@ async def get_mutual_funds(
 ):
     try:
         url = "https://api.mfapi.in/mf"
-        response = httpx.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = await upstream.fetch_json(url)
 
         if start >= len(data):
             raise HTTPException(status_code=400, detail="Start index out of range")
@@ -96,13 +109,8 @@ async def get_mutual_funds(
 @router.get("/search")
 async def search_funds(q: str):
     try:
-        all_scheme_codes = mf.get_scheme_codes()
-        matching_funds = [
-            {"code": code, "name": name.replace("Scheme", "").strip()}
-            for code, name in all_scheme_codes.items()
-            if q.lower() in name.lower()
-        ]
-        return {"funds": matching_funds[:10]}  # top 10 matches
+        schemes = await catalog.get_catalog()
+        return {"funds": schemes.search(q, limit=10)}  # top 10 matches
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -115,19 +123,14 @@ async def get_funds_by_initial(
     initial: str = Query(..., min_length=1, max_length=1, description="Initial letter filter")
 ):
     try:
-        all_scheme_codes = mf.get_scheme_codes()
-        initial_lower = initial.lower()
-        filtered_funds = [
-            {"code": code, "name": name.replace("Scheme", "").strip()}
-            for code, name in all_scheme_codes.items()
-            if name and name.lower().startswith(initial_lower)
-        ]
-        return {"funds": filtered_funds}
+        schemes = await catalog.get_catalog()
+        return {"funds": schemes.starting_with(initial)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---------------------------
-# Include nav_history router
+# Include nav_history and fund page routers
 # ---------------------------
 router.include_router(nav_history_router)
+router.include_router(fund_page_router)
@@ -1,18 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# Routers
+# Routers (heavy dependencies such as pandas / mftool are imported lazily
+# inside the routers, so these imports stay cheap)
 from app.auth import router as auth_router
 from app.funds import router as funds_router
 from app.fundDetail import router as fund_detail_router
 from app.questionnaire import router as questionnaire_router
 from app.routers.users import router as users_router
 from app.routers.mutualfunds import router as mf_router
+from app.upstream import router as upstream_router
+from app.nav_refresh import router as nav_refresh_router
+from app.backtest import router as backtest_router
+from app.correlation import router as correlation_router
+from app.nav_stream import router as nav_stream_router
+from app import nav_refresh, nav_stream, recommendations, upstream
 
-
-# Database & Models
-from app.database import engine, Base
-from app import models
+from app.warmup import WARMUP_ON_STARTUP, warm_up
 
 # ---------------------------
 # FastAPI app initialization
@@ -39,6 +43,11 @@ app.include_router(questionnaire_router, prefix="/api/questionnaire", tags=["Que
 app.include_router(users_router, prefix="/api/users", tags=["Users"])
 app.include_router(mf_router, prefix="/api/mutual-funds", tags=["Mutual Funds Database"])
 app.include_router(fund_detail_router, prefix="/api/mutual-funds/risk", tags=["Mutual Funds Risk"])
+app.include_router(upstream_router, prefix="/api/upstream", tags=["Upstream"])
+app.include_router(nav_refresh_router, prefix="/api/nav-refresh", tags=["NAV Refresh"])
+app.include_router(backtest_router, prefix="/api/backtest", tags=["Backtest"])
+app.include_router(correlation_router, prefix="/api/correlation", tags=["Correlation"])
+app.include_router(nav_stream_router, prefix="/api/nav-stream", tags=["NAV Stream"])
 
 # ---------------------------
 # Root endpoint
@@ -48,10 +57,28 @@ async def root():
     return {"message": "Hello from FastAPI (dev)"}
 
 # ---------------------------
-# Startup: initialize DB
+# Startup: optional warm-up, NAV refresh scheduler, risk index and live NAV stream
+# Tables are no longer created here, run `python create_db.py` once instead.
 # ---------------------------
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("✅ Database tables created")
+    if WARMUP_ON_STARTUP:
+        try:
+            timings = await warm_up()
+            print(f"✅ Warm-up done: {timings}")
+        except Exception as e:
+            # Warm-up is best effort; requests will load things lazily instead
+            print(f"⚠️ Warm-up failed: {e}")
+    if nav_refresh.NAV_REFRESH_ENABLED:
+        nav_refresh.start_scheduler()
+    recommendations.start()
+    nav_stream.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # ends open event streams so the server doesn't wait on them
+    await nav_stream.stop()
+    await recommendations.stop()
+    await nav_refresh.stop_scheduler()
+    await upstream.aclose()
@@ -1,6 +1,6 @@
 # app/models.py
 from app.database import Base, engine
-from sqlalchemy import Column, Integer, String, DateTime, func, Numeric
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, func, Numeric
 
 class User(Base):
     __tablename__ = "users"
@@ -15,11 +15,67 @@ class MutualFund(Base):
     __tablename__ = "mutualfunds"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False)
-    category = Column(String(50), nullable=True)
-    nav = Column(Numeric(10, 2), nullable=True)
+    scheme_code = Column(String(20), nullable=True, unique=True, index=True)
+    name = Column(String(200), nullable=False)
+    category = Column(String(100), nullable=True)
+    nav = Column(Numeric(12, 4), nullable=True)
+    nav_date = Column(Date, nullable=True)
+    risk_score = Column(Float, nullable=True)
+    risk_category = Column(String(30), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
-async def init_models():
+class NavHistory(Base):
+    __tablename__ = "nav_history"
+
+    scheme_code = Column(String(20), primary_key=True)
+    nav_date = Column(Date, primary_key=True)
+    nav = Column(Numeric(12, 4), nullable=False)
+
+# create_all() never alters a table that already exists. Databases created
+# before the bulk loader have mutualfunds(id, name, category, nav, created_at),
+# so upgrade_mutualfunds() brings them to the current model in place.
+_MUTUALFUND_NEW_COLUMNS = {
+    "scheme_code": "VARCHAR(20)",
+    "nav_date": "DATE",
+    "risk_score": "FLOAT",
+    "risk_category": "VARCHAR(30)",
+}
+
+
+def upgrade_mutualfunds(conn) -> list[str]:
+    """Adds missing columns / the scheme_code unique index; returns what it changed."""
+    from sqlalchemy import inspect, text
+
+    columns = {c["name"]: c for c in inspect(conn).get_columns("mutualfunds")}
+    changed = []
+    for name, ddl in _MUTUALFUND_NEW_COLUMNS.items():
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE mutualfunds ADD COLUMN {name} {ddl}"))
+            changed.append(f"add {name}")
+
+    if conn.dialect.name == "postgresql":
+        # SQLite doesn't enforce lengths / precision, PostgreSQL does
+        widen = []
+        if (columns["name"]["type"].length or 0) < 200:
+            widen.append("ALTER COLUMN name TYPE VARCHAR(200)")
+        if (columns["category"]["type"].length or 0) < 100:
+            widen.append("ALTER COLUMN category TYPE VARCHAR(100)")
+        nav_type = columns["nav"]["type"]
+        if (getattr(nav_type, "precision", None), getattr(nav_type, "scale", None)) != (12, 4):
+            widen.append("ALTER COLUMN nav TYPE NUMERIC(12, 4)")
+        if widen:
+            conn.execute(text(f"ALTER TABLE mutualfunds {', '.join(widen)}"))
+            changed += widen
+
+    indexes = {i["name"] for i in inspect(conn).get_indexes("mutualfunds")}
+    if "ix_mutualfunds_scheme_code" not in indexes:
+        # same name create_all() gives it, so fresh and upgraded databases match
+        conn.execute(text("CREATE UNIQUE INDEX ix_mutualfunds_scheme_code ON mutualfunds (scheme_code)"))
+        changed.append("add unique index on scheme_code")
+    return changed
+
+
+async def init_models() -> list[str]:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        return await conn.run_sync(upgrade_mutualfunds)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
-import httpx
+
+from app import upstream
 
 router = APIRouter()
 
@@ -12,15 +13,12 @@ async def get_nav_history(scheme_code: str):
     """
     url = f"{BASE_URL}/{scheme_code}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-            return {"data": data.get("data", [])}
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"HTTP error occurred: {e}")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"Request error: {e}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
+    try:
+        data = await upstream.fetch_json(url)
+        return {"data": data.get("data", [])}
+    except upstream.UpstreamHTTPError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"HTTP error occurred: {e.detail}")
+    except upstream.UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Request error: {e.detail}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
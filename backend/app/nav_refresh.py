@@ -0,0 +1,517 @@
+# app/nav_refresh.py
+# Background NAV refresh: after each day's AMFI publication, walk every scheme
+# in a freshly downloaded AMFI scheme list, pull its history from mfapi.in
+# with a bounded worker pool + rate limit, store new NAVs and recompute the
+# risk score.
+#
+# Progress is checkpointed to a JSON file so a crashed run resumes where it
+# stopped. A lock file next to the checkpoint allows one run at a time across
+# processes. Run it either
+#   - in-process: NAV_REFRESH_ENABLED=1 (enable it on ONE worker only), or
+#   - as a separate worker:  python -m app.nav_refresh [--loop]
+# POST /api/nav-refresh/run is only accepted by the worker running the
+# scheduler.
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import upstream
+from app.amfi_loader import DEFAULT_BATCH_SIZE, NavRecord, parse_nav_date, upsert_batch
+from app.database import AsyncSessionLocal
+from app.models import MutualFund, NavHistory
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+router = APIRouter()
+
+BASE_URL = "https://api.mfapi.in/mf"
+
+NAV_REFRESH_ENABLED = os.getenv("NAV_REFRESH_ENABLED", "0").lower() in ("1", "true", "yes")
+# AMFI publishes the day's NAVs by ~23:00 IST
+NAV_REFRESH_AT = os.getenv("NAV_REFRESH_AT", "23:30")
+NAV_REFRESH_WORKERS = int(os.getenv("NAV_REFRESH_WORKERS", "8"))
+NAV_REFRESH_RATE = float(os.getenv("NAV_REFRESH_RATE", "20"))  # requests / second
+NAV_REFRESH_CHECKPOINT = os.getenv(
+    "NAV_REFRESH_CHECKPOINT",
+    os.path.join(os.path.dirname(__file__), "..", ".nav_refresh_checkpoint.json"),
+)
+CHECKPOINT_EVERY = 200
+WRITE_BATCH = 50  # schemes per DB transaction
+
+# Downstream hooks.
+#   scheme hooks:  async fn(scheme_code, new_records)  - after new NAVs are stored
+#   run hooks:     async fn(summary)                   - after a full run completes
+SchemeHook = Callable[[str, list[NavRecord]], Awaitable[None]]
+RunHook = Callable[[dict], Awaitable[None]]
+scheme_hooks: list[SchemeHook] = []
+run_hooks: list[RunHook] = []
+
+progress = {
+    "status": "idle",
+    "run_date": None,
+    "total": 0,
+    "done": 0,
+    "updated": 0,
+    "failed": 0,
+    "resumed_from": 0,
+    "started_at": None,
+    "finished_at": None,
+    "schemes_per_sec": None,
+    "eta_seconds": None,
+    "next_run_at": None,
+}
+
+_run_lock = asyncio.Lock()
+_scheduler_task: Optional[asyncio.Task] = None
+_manual_runs: set[asyncio.Task] = set()
+
+
+# ---------------------------
+# Rate limiting / checkpoints
+# ---------------------------
+class RateLimiter:
+    # Spaces out request starts to at most `rate` per second
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self._interval
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.run_date: Optional[str] = None
+        self.done: set[str] = set()
+        self.complete = False
+
+    def load(self) -> "Checkpoint":
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+            self.run_date = data.get("run_date")
+            self.done = set(data.get("done", []))
+            self.complete = bool(data.get("complete"))
+        except (OSError, ValueError):
+            pass
+        return self
+
+    def start(self, run_date: str) -> None:
+        # Keep progress only when resuming the same unfinished run
+        if self.run_date != run_date or self.complete:
+            self.run_date = run_date
+            self.done = set()
+            self.complete = False
+
+    def save(self) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(
+                {"run_date": self.run_date, "complete": self.complete, "done": sorted(self.done)},
+                fh,
+            )
+        os.replace(tmp, self.path)
+
+
+@contextlib.contextmanager
+def _run_file_lock(path: str):
+    """
+    Holds an exclusive lock on `path`.lock for a whole run, so the scheduler
+    worker, a manual trigger and `python -m app.nav_refresh` never crawl and
+    write the same checkpoint at the same time.
+    """
+    with open(f"{path}.lock", "a") as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError("A NAV refresh run is already in progress in another process")
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# ---------------------------
+# Per-scheme refresh
+# ---------------------------
+class SchemeUpdate(NamedTuple):
+    scheme_code: str
+    records: list[NavRecord]  # NAVs newer than the DB, oldest first
+    risk: Optional[dict]
+
+
+def _compute_risk(history: list[dict]) -> Optional[dict]:
+    from app.fundDetail import _parse_nav_arrays, _riskometer_from_nav
+
+    try:
+        return _riskometer_from_nav(_parse_nav_arrays(history)[1], freq="D")
+    except ValueError:
+        return None
+
+
+async def fetch_scheme(scheme_code: str, last: Optional[date]) -> Optional[SchemeUpdate]:
+    """
+    Fetches one scheme's history and keeps the NAVs newer than `last` (the
+    latest date already stored). Returns None when there is nothing new.
+    """
+    # a full run touches every scheme once; keep it out of the stale cache
+    payload = await upstream.fetch_json(f"{BASE_URL}/{scheme_code}", remember=False)
+    history = payload.get("data") or []
+    meta = payload.get("meta") or {}
+
+    records = []
+    for row in history:
+        nav_date = parse_nav_date(str(row.get("date", "")))
+        try:
+            nav = float(row.get("nav"))
+        except (TypeError, ValueError):
+            continue
+        if nav_date is None or (last is not None and nav_date <= last):
+            continue
+        records.append(NavRecord(
+            scheme_code,
+            meta.get("scheme_name") or scheme_code,
+            meta.get("scheme_category"),
+            nav,
+            nav_date,
+        ))
+    if not records:
+        return None
+    records.sort(key=lambda r: r.nav_date)
+
+    # Downstream recomputation: the risk score depends on the full history
+    risk = await asyncio.to_thread(_compute_risk, history)
+    return SchemeUpdate(scheme_code, records, risk)
+
+
+async def store_updates(session: AsyncSession, updates: list[SchemeUpdate]) -> None:
+    records = [rec for u in updates for rec in u.records]
+    for i in range(0, len(records), DEFAULT_BATCH_SIZE):
+        await upsert_batch(session, records[i:i + DEFAULT_BATCH_SIZE])
+
+    risks = [
+        {"b_code": u.scheme_code, "b_score": u.risk["risk_score"], "b_category": u.risk["category"]}
+        for u in updates
+        if u.risk
+    ]
+    if risks:
+        funds = MutualFund.__table__
+        await session.execute(
+            update(funds)
+            .where(funds.c.scheme_code == bindparam("b_code"))
+            .values(risk_score=bindparam("b_score"), risk_category=bindparam("b_category")),
+            risks,
+        )
+    await session.commit()
+
+
+async def _store_batch(updates: list[SchemeUpdate]) -> None:
+    async def store():
+        async with AsyncSessionLocal() as session:
+            await store_updates(session, updates)
+
+    # A cancel landing inside aiosqlite can come back as an ordinary DB error,
+    # which the writer would log and carry on from; let the transaction finish
+    # on its own and re-raise the cancel here instead.
+    task = asyncio.ensure_future(store())
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        await asyncio.wait([task])
+        raise
+
+
+async def _last_nav_dates() -> dict[str, date]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(NavHistory.scheme_code, func.max(NavHistory.nav_date)).group_by(NavHistory.scheme_code)
+        )
+        return {code: last for code, last in result.all()}
+
+
+# ---------------------------
+# Full run
+# ---------------------------
+def _scheme_codes() -> list[str]:
+    from app.funds import fresh_scheme_codes
+
+    # the AMFI header row ("Scheme Code") comes back as a key too
+    return [code for code in fresh_scheme_codes() if str(code).isdigit()]
+
+
+def _update_rate(started: float) -> None:
+    elapsed = time.perf_counter() - started
+    processed = progress["done"] - progress["resumed_from"]
+    if elapsed > 0 and processed:
+        rate = processed / elapsed
+        progress["schemes_per_sec"] = round(rate, 2)
+        progress["eta_seconds"] = round((progress["total"] - progress["done"]) / rate)
+
+
+async def _notify(updates: list[SchemeUpdate]) -> None:
+    for u in updates:
+        for hook in scheme_hooks:
+            try:
+                await hook(u.scheme_code, u.records)
+            except Exception as e:
+                print(f"⚠️ NAV refresh hook failed for {u.scheme_code}: {e}")
+
+
+async def refresh_all(run_date: Optional[str] = None) -> dict:
+    """
+    Refreshes every scheme once. An unfinished checkpoint for the same run
+    (or, without `run_date`, any unfinished checkpoint) is resumed.
+
+    Fetch workers (bounded by NAV_REFRESH_WORKERS and NAV_REFRESH_RATE) hand
+    their results to a single writer, which stores them in batches and only
+    then checkpoints the schemes as done.
+    """
+    if _run_lock.locked():
+        raise RuntimeError("A NAV refresh run is already in progress")
+
+    async with _run_lock:
+        with _run_file_lock(NAV_REFRESH_CHECKPOINT):
+            summary = await _run(run_date)
+
+    for hook in run_hooks:
+        try:
+            await hook(summary)
+        except Exception as e:
+            print(f"⚠️ NAV refresh run hook failed: {e}")
+    return summary
+
+
+async def _run(run_date: Optional[str]) -> dict:
+    checkpoint = Checkpoint(NAV_REFRESH_CHECKPOINT).load()
+    if run_date is None:
+        if checkpoint.run_date and not checkpoint.complete:
+            run_date = checkpoint.run_date
+        else:
+            run_date = date.today().isoformat()
+    checkpoint.start(run_date)
+
+    codes = await asyncio.to_thread(_scheme_codes)
+    pending = [code for code in codes if code not in checkpoint.done]
+    last_dates = await _last_nav_dates()
+
+    started = time.perf_counter()
+    progress.update({
+        "status": "running",
+        "run_date": run_date,
+        "total": len(codes),
+        "done": len(codes) - len(pending),
+        "resumed_from": len(codes) - len(pending),
+        "updated": 0,
+        "failed": 0,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "finished_at": None,
+        "schemes_per_sec": None,
+        "eta_seconds": None,
+    })
+
+    todo: asyncio.Queue = asyncio.Queue()
+    for code in pending:
+        todo.put_nowait(code)
+    # bounded, so fetchers pause when the writer falls behind
+    results: asyncio.Queue = asyncio.Queue(maxsize=WRITE_BATCH * 2)
+    limiter = RateLimiter(NAV_REFRESH_RATE)
+
+    async def fetcher():
+        while True:
+            try:
+                code = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await limiter.wait()
+            try:
+                await results.put((code, await fetch_scheme(code, last_dates.get(code))))
+            except upstream.UpstreamHTTPError as e:
+                if e.status_code < 500:
+                    # scheme unknown to mfapi.in, nothing to retry
+                    await results.put((code, None))
+                else:
+                    await results.put((code, e))
+            except Exception as e:
+                await results.put((code, e))
+
+    async def writer():
+        since_save = 0
+        finished = False
+        while not finished:
+            batch = [await results.get()]
+            while len(batch) < WRITE_BATCH and not results.empty():
+                batch.append(results.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                finished = True
+
+            updates = [r for _, r in batch if isinstance(r, SchemeUpdate)]
+            if updates:
+                try:
+                    await _store_batch(updates)
+                except Exception as e:
+                    # keep the run going; these schemes stay pending
+                    print(f"⚠️ NAV refresh write failed: {e}")
+                    batch = [(u.scheme_code, e) if isinstance(u, SchemeUpdate) else (code, u) for code, u in batch]
+                    updates = []
+            for code, r in batch:
+                if isinstance(r, Exception):
+                    # failed schemes are retried on the next (or resumed) run
+                    progress["failed"] += 1
+                else:
+                    checkpoint.done.add(code)
+            progress["updated"] += len(updates)
+            progress["done"] += len(batch)
+            _update_rate(started)
+
+            since_save += len(batch)
+            if since_save >= CHECKPOINT_EVERY:
+                since_save = 0
+                checkpoint.save()
+            await _notify(updates)
+
+    async def fetch_all():
+        await asyncio.gather(*(fetcher() for _ in range(NAV_REFRESH_WORKERS)))
+        await results.put(None)
+
+    fetch_task = asyncio.create_task(fetch_all())
+    writer_task = asyncio.create_task(writer())
+    try:
+        # gather raises as soon as the writer fails (e.g. a checkpoint write),
+        # instead of leaving the fetchers blocked on the full results queue
+        await asyncio.gather(fetch_task, writer_task)
+    finally:
+        fetch_task.cancel()
+        writer_task.cancel()
+        await asyncio.gather(fetch_task, writer_task, return_exceptions=True)
+        progress["status"] = "idle"
+        progress["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        checkpoint.complete = progress["done"] == progress["total"] and progress["failed"] == 0
+        checkpoint.save()
+
+    summary = {k: progress[k] for k in ("run_date", "total", "done", "updated", "failed", "schemes_per_sec")}
+    summary["seconds"] = round(time.perf_counter() - started, 1)
+    print(f"✅ NAV refresh finished: {summary}")
+    return summary
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+def _next_run_at(now: datetime) -> datetime:
+    hour, minute = (int(part) for part in NAV_REFRESH_AT.split(":"))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+async def scheduler_loop() -> None:
+    # Resume an interrupted run straight away, then run daily at NAV_REFRESH_AT
+    checkpoint = Checkpoint(NAV_REFRESH_CHECKPOINT).load()
+    if checkpoint.run_date and not checkpoint.complete:
+        await _safe_refresh(None)
+
+    while True:
+        run_at = _next_run_at(datetime.now())
+        progress["next_run_at"] = run_at.isoformat(timespec="seconds")
+        await asyncio.sleep((run_at - datetime.now()).total_seconds())
+        await _safe_refresh(run_at.date().isoformat())
+
+
+async def _safe_refresh(run_date: Optional[str]) -> None:
+    try:
+        await refresh_all(run_date)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ NAV refresh failed: {e}")
+
+
+def start_scheduler() -> None:
+    global _scheduler_task
+    if _scheduler_task is None:
+        _scheduler_task = asyncio.create_task(scheduler_loop())
+
+
+async def stop_scheduler() -> None:
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+        _scheduler_task = None
+
+
+# ---------------------------
+# Monitoring / manual trigger
+# ---------------------------
+@router.get("/status")
+async def get_refresh_status():
+    return progress
+
+
+@router.post("/run", status_code=202)
+async def trigger_refresh():
+    if _scheduler_task is None:
+        # only the worker that owns the scheduler runs refreshes; the lock
+        # file still guards against a standalone `python -m app.nav_refresh`
+        raise HTTPException(
+            status_code=409,
+            detail="NAV refresh is not enabled on this worker (set NAV_REFRESH_ENABLED=1 on one worker)",
+        )
+    if _run_lock.locked():
+        raise HTTPException(status_code=409, detail="A NAV refresh run is already in progress")
+    task = asyncio.create_task(_safe_refresh(None))
+    _manual_runs.add(task)
+    task.add_done_callback(_manual_runs.discard)
+    return {"status": "started"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh NAVs for every scheme")
+    parser.add_argument("--loop", action="store_true", help=f"keep running daily at {NAV_REFRESH_AT}")
+    args = parser.parse_args()
+
+    # this process does the refresh, so it also publishes the similarity
+    # index afterwards (the web app registers the same hook by importing it)
+    from app import correlation
+    run_hooks.append(correlation.on_refresh_complete)
+
+    async def _main():
+        try:
+            if args.loop:
+                await scheduler_loop()
+            else:
+                await refresh_all()
+        finally:
+            await upstream.aclose()
+            from app.database import engine
+            await engine.dispose()
+
+    asyncio.run(_main())
@@ -0,0 +1,310 @@
+# app/nav_stream.py
+# Live NAV updates over server-sent events.
+#
+#   GET /api/nav-stream?codes=119551,120503
+#
+# streams one compact event per new NAV of a subscribed scheme:
+#
+#   id: 42
+#   event: nav
+#   data: {"scheme":"119551","date":"17-10-2026","nav":123.4567,"change_pct":0.42}
+#
+# A per-worker hub fans events out to subscribers. Each subscriber is a
+# bounded queue; an event is encoded once and the same bytes are queued for
+# every subscriber of that scheme. A subscriber whose queue is full is
+# dropped with a final `reset` event (EventSource reconnects by itself), so
+# one slow client never holds memory or back-pressure for the others. Idle
+# connections cost a queue and a suspended generator; keep-alive pings come
+# from one hub-wide timer instead of a timer per connection.
+#
+# NAVs reach the hub from
+#   - nav_refresh scheme hooks, in the process running the refresh, and
+#   - a poller reading mutualfunds.nav for subscribed schemes, so workers
+#     that don't run the refresh see the same updates (NAV_STREAM_POLL).
+# NAV_STREAM_FAKE_INTERVAL=<seconds> adds a random-walk source for local
+# development and load tests.
+import asyncio
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app import nav_refresh
+from app.amfi_loader import NavRecord
+from app.database import AsyncSessionLocal
+from app.models import MutualFund
+
+router = APIRouter()
+
+NAV_STREAM_QUEUE = int(os.getenv("NAV_STREAM_QUEUE", "64"))  # events buffered per subscriber
+NAV_STREAM_MAX_SUBSCRIBERS = int(os.getenv("NAV_STREAM_MAX_SUBSCRIBERS", "10000"))  # per worker
+NAV_STREAM_MAX_CODES = int(os.getenv("NAV_STREAM_MAX_CODES", "200"))  # per subscriber
+NAV_STREAM_HEARTBEAT = float(os.getenv("NAV_STREAM_HEARTBEAT", "15"))
+NAV_STREAM_POLL = float(os.getenv("NAV_STREAM_POLL", "30"))  # 0 disables the DB poller
+NAV_STREAM_FAKE_INTERVAL = float(os.getenv("NAV_STREAM_FAKE_INTERVAL", "0"))
+POLL_CHUNK = 500
+
+PING = b": ping\n\n"
+RESET = b'event: reset\ndata: {"reason":"slow consumer"}\n\n'
+CLOSE = b'event: reset\ndata: {"reason":"server shutdown"}\n\n'
+
+
+# ---------------------------
+# Hub
+# ---------------------------
+class Subscriber:
+    __slots__ = ("codes", "queue", "closed")
+
+    def __init__(self, codes: frozenset, queue_size: int):
+        self.codes = codes
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+
+class NavHub:
+    def __init__(self, queue_size: int = NAV_STREAM_QUEUE, max_subscribers: int = NAV_STREAM_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subs: set[Subscriber] = set()
+        self._by_code: dict[str, set[Subscriber]] = {}
+        # last (date, nav) seen per subscribed scheme, for change % and dedup
+        self._latest: dict[str, tuple[date, float]] = {}
+        self._seq = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def is_full(self) -> bool:
+        return len(self._subs) >= self.max_subscribers
+
+    def codes(self) -> list[str]:
+        return list(self._by_code)
+
+    def subscribe(self, codes) -> Subscriber:
+        sub = Subscriber(frozenset(codes), self.queue_size)
+        for code in sub.codes:
+            self._by_code.setdefault(code, set()).add(sub)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if sub.closed:
+            return
+        sub.closed = True
+        self._subs.discard(sub)
+        for code in sub.codes:
+            subs = self._by_code.get(code)
+            if subs is None:
+                continue
+            subs.discard(sub)
+            if not subs:
+                del self._by_code[code]
+                self._latest.pop(code, None)
+
+    def _offer(self, sub: Subscriber, frame: bytes) -> bool:
+        try:
+            sub.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            # slow consumer: free its backlog and tell it to reconnect
+            self.unsubscribe(sub)
+            self.dropped += 1
+            _drain(sub.queue)
+            sub.queue.put_nowait(RESET)
+            return False
+
+    def observe(self, scheme_code: str, nav_date: date, nav: float, emit_first: bool = True) -> int:
+        """
+        Feeds one NAV. Emits an event when it is newer than the last one seen
+        for a subscribed scheme; a first sighting with emit_first=False only
+        sets the baseline. Returns the number of subscribers it was queued for.
+        """
+        subs = self._by_code.get(scheme_code)
+        if not subs:
+            return 0
+        prev = self._latest.get(scheme_code)
+        if prev is not None and nav_date <= prev[0]:
+            return 0
+        self._latest[scheme_code] = (nav_date, nav)
+        if prev is None and not emit_first:
+            return 0
+
+        change = round((nav / prev[1] - 1) * 100, 4) if prev is not None and prev[1] else None
+        self._seq += 1
+        data = json.dumps(
+            {"scheme": scheme_code, "date": nav_date.strftime("%d-%m-%Y"), "nav": nav, "change_pct": change},
+            separators=(",", ":"),
+        )
+        frame = f"id: {self._seq}\nevent: nav\ndata: {data}\n\n".encode()
+        self.published += 1
+        sent = 0
+        for sub in list(subs):
+            sent += self._offer(sub, frame)
+        self.delivered += sent
+        return sent
+
+    def ping(self) -> None:
+        for sub in self._subs:
+            # a full queue already has something to send
+            if not sub.queue.full():
+                sub.queue.put_nowait(PING)
+
+    def close_all(self) -> None:
+        for sub in list(self._subs):
+            self.unsubscribe(sub)
+            _drain(sub.queue)
+            sub.queue.put_nowait(CLOSE)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subs),
+            "schemes": len(self._by_code),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_slow_consumers": self.dropped,
+        }
+
+
+def _drain(queue: asyncio.Queue) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+
+
+hub = NavHub()
+
+
+# ---------------------------
+# Sources
+# ---------------------------
+async def _on_new_navs(scheme_code: str, records: list[NavRecord]) -> None:
+    for rec in records:
+        hub.observe(scheme_code, rec.nav_date, float(rec.nav))
+
+
+nav_refresh.scheme_hooks.append(_on_new_navs)
+
+
+async def poll_once(h: NavHub = hub) -> int:
+    """Reads the latest stored NAV of every subscribed scheme."""
+    codes = h.codes()
+    sent = 0
+    async with AsyncSessionLocal() as session:
+        for i in range(0, len(codes), POLL_CHUNK):
+            result = await session.execute(
+                select(MutualFund.scheme_code, MutualFund.nav_date, MutualFund.nav).where(
+                    MutualFund.scheme_code.in_(codes[i:i + POLL_CHUNK]),
+                    MutualFund.nav_date.is_not(None),
+                )
+            )
+            for code, nav_date, nav in result.all():
+                # the first poll after subscribing only records the baseline
+                sent += h.observe(code, nav_date, float(nav), emit_first=False)
+    return sent
+
+
+async def poll_loop(interval: float = NAV_STREAM_POLL) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if not hub.subscribers:
+            continue
+        try:
+            await poll_once()
+        except Exception as e:
+            print(f"⚠️ NAV stream poll failed: {e}")
+
+
+async def fake_source(interval: float, h: NavHub = hub, seed: Optional[int] = None) -> None:
+    """Random-walk NAVs for every subscribed scheme, one business day per tick."""
+    rng = random.Random(seed)
+    navs: dict[str, float] = {}
+    day = date.today()
+    while True:
+        await asyncio.sleep(interval)
+        day += timedelta(days=3 if day.weekday() == 4 else 1)
+        for code in h.codes():
+            nav = navs.get(code) or rng.uniform(10, 500)
+            navs[code] = nav = round(nav * (1 + rng.gauss(0.0004, 0.01)), 4)
+            h.observe(code, day, nav)
+
+
+async def heartbeat_loop(interval: float = NAV_STREAM_HEARTBEAT) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        hub.ping()
+
+
+# ---------------------------
+# Lifecycle
+# ---------------------------
+_tasks: list[asyncio.Task] = []
+
+
+def start() -> None:
+    if _tasks:
+        return
+    _tasks.append(asyncio.create_task(heartbeat_loop()))
+    if NAV_STREAM_POLL > 0:
+        _tasks.append(asyncio.create_task(poll_loop()))
+    if NAV_STREAM_FAKE_INTERVAL > 0:
+        print(f"⚠️ NAV stream is serving FAKE NAVs every {NAV_STREAM_FAKE_INTERVAL}s")
+        _tasks.append(asyncio.create_task(fake_source(NAV_STREAM_FAKE_INTERVAL)))
+
+
+async def stop() -> None:
+    hub.close_all()
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+# ---------------------------
+# Endpoints
+# ---------------------------
+async def _event_stream(codes: list[str]):
+    # subscribing inside the generator ties the subscription to the response:
+    # the finally block runs however the connection ends
+    sub = hub.subscribe(codes)
+    try:
+        yield f"retry: 5000\nevent: ready\ndata: {json.dumps({'codes': codes}, separators=(',', ':'))}\n\n".encode()
+        while True:
+            frame = await sub.queue.get()
+            yield frame
+            if frame is RESET or frame is CLOSE:
+                return
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("")
+async def stream_navs(codes: str = Query(..., description="Comma-separated scheme codes")):
+    wanted = list(dict.fromkeys(c.strip() for c in codes.split(",") if c.strip()))
+    if not wanted:
+        raise HTTPException(status_code=400, detail="No scheme codes given")
+    if len(wanted) > NAV_STREAM_MAX_CODES:
+        raise HTTPException(status_code=400, detail=f"At most {NAV_STREAM_MAX_CODES} scheme codes per stream")
+    bad = [c for c in wanted if not c.isdigit()]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Invalid scheme codes: {', '.join(bad[:5])}")
+    if hub.is_full():
+        raise HTTPException(status_code=503, detail="Too many live NAV streams, retry later")
+
+    return StreamingResponse(
+        _event_stream(wanted),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def stream_stats():
+    return hub.stats()
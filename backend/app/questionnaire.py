@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
+from app import recommendations
+
 router = APIRouter()
 
 QUESTIONS = [
@@ -140,6 +144,16 @@ SCORE_RANGES = [
     (51, 60, "Flamboyant / Risk Taker"),
 ]
 
+# Target band of computed risk scores (0-100, see fundDetail._riskometer_from_nav)
+# for each profile; the bands follow the riskometer category cut-offs
+RISK_BANDS = {
+    "Ultra-Conservative": (0, 20),             # Very Low
+    "Conservative but Calculative": (20, 40),  # Low
+    "Balanced Growth": (40, 60),               # Moderate
+    "Aggressive Growth": (60, 80),             # Moderately High
+    "Flamboyant / Risk Taker": (80, 100),      # High / Very High
+}
+
 
 class Answer(BaseModel):
     question_id: int
@@ -183,4 +197,41 @@ async def submit_answer(user_id: str, answer: Answer):
         "Unclassified",
     )
     del user_data[user_id]
-    return {"score": score, "result": result}
+
+    response = {"score": score, "result": result}
+    if result in RISK_BANDS:
+        lo, hi = RISK_BANDS[result]
+        response["risk_band"] = {"min": lo, "max": hi}
+        try:
+            index = recommendations.get_index()
+            response["recommendations"] = index.lookup(lo, hi, 10) if index else []
+        except Exception:
+            # recommendations are a bonus; never fail the questionnaire over them
+            response["recommendations"] = []
+    return response
+
+
+@router.get("/recommendations")
+async def get_recommendations(
+    profile: str = Query(..., description="Profile label returned by the questionnaire"),
+    category: Optional[str] = Query(None, description="Limit to one scheme category"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    if profile not in RISK_BANDS:
+        raise HTTPException(400, f"Unknown profile. Expected one of: {', '.join(RISK_BANDS)}")
+    lo, hi = RISK_BANDS[profile]
+
+    index = recommendations.get_index()
+    if index is None:
+        raise HTTPException(503, "Risk scores are not available yet; run the NAV refresh first")
+
+    funds = index.lookup(lo, hi, limit, category)
+    if funds is None:
+        raise HTTPException(404, f"Unknown category. Known categories: {', '.join(index.categories())}")
+    return {
+        "profile": profile,
+        "risk_band": {"min": lo, "max": hi},
+        "category": category,
+        "funds": funds,
+        "universe_size": index.size,
+    }
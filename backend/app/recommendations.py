@@ -0,0 +1,154 @@
+# app/recommendations.py
+# Risk-profile matched fund recommendations.
+#
+# Risk scores (0-100, from fundDetail._riskometer_from_nav) are stored on
+# mutualfunds by the NAV refresh job. They are loaded into per-category
+# arrays sorted by score, so "funds with a score in [lo, hi)" is two
+# np.searchsorted calls plus a top-n selection, independent of how many
+# schemes the universe holds.
+#
+# The index is built at warm-up / startup and rebuilt in the background every
+# RISK_INDEX_TTL seconds and after each NAV refresh run; requests only read it.
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import select
+
+from app import nav_refresh
+from app.database import AsyncSessionLocal
+from app.models import MutualFund
+
+if TYPE_CHECKING:
+    import numpy as np
+
+RISK_INDEX_TTL = float(os.getenv("RISK_INDEX_TTL", "3600"))
+ALL_CATEGORIES = "*"
+
+
+class _Bucket:
+    def __init__(self, scores: np.ndarray, codes: list[str], names: list[str], categories: list[Optional[str]]):
+        import numpy as np
+
+        order = np.argsort(scores, kind="stable")
+        self.scores = scores[order]
+        self.codes = [codes[i] for i in order]
+        self.names = [names[i] for i in order]
+        self.categories = [categories[i] for i in order]
+
+    def lookup(self, lo: float, hi: float, limit: int) -> list[dict]:
+        import numpy as np
+
+        start = int(np.searchsorted(self.scores, lo, side="left"))
+        # bands are [lo, hi), except that the top band includes 100
+        stop = int(np.searchsorted(self.scores, hi, side="right" if hi >= 100 else "left"))
+        if stop <= start:
+            return []
+        # rank by distance to the middle of the band
+        distance = np.abs(self.scores[start:stop] - (lo + hi) / 2)
+        n = min(limit, stop - start)
+        top = np.argpartition(distance, n - 1)[:n] if n < len(distance) else np.arange(len(distance))
+        top = top[np.argsort(distance[top], kind="stable")]
+        return [
+            {
+                "code": self.codes[start + i],
+                "name": self.names[start + i],
+                "category": self.categories[start + i],
+                "risk_score": round(float(self.scores[start + i]), 2),
+            }
+            for i in top.tolist()
+        ]
+
+
+class RiskIndex:
+    def __init__(self, rows: list[tuple[str, str, Optional[str], float]]):
+        import numpy as np
+
+        by_category: dict[str, list[int]] = {}
+        for i, (_, _, category, _) in enumerate(rows):
+            by_category.setdefault(category or "Other", []).append(i)
+
+        codes = [r[0] for r in rows]
+        names = [r[1] for r in rows]
+        categories = [r[2] for r in rows]
+        scores = np.array([r[3] for r in rows], dtype=np.float64)
+
+        self.buckets = {ALL_CATEGORIES: _Bucket(scores, codes, names, categories)}
+        for category, idx in by_category.items():
+            self.buckets[category] = _Bucket(
+                scores[idx],
+                [codes[i] for i in idx],
+                [names[i] for i in idx],
+                [categories[i] for i in idx],
+            )
+        self.size = len(rows)
+        self.built_at = time.time()
+
+    def categories(self) -> list[str]:
+        return sorted(c for c in self.buckets if c != ALL_CATEGORIES)
+
+    def lookup(self, lo: float, hi: float, limit: int, category: Optional[str] = None) -> Optional[list[dict]]:
+        bucket = self.buckets.get(category or ALL_CATEGORIES)
+        if bucket is None:
+            return None
+        return bucket.lookup(lo, hi, limit)
+
+
+_index: Optional[RiskIndex] = None
+_index_lock = asyncio.Lock()
+_refresher: Optional[asyncio.Task] = None
+
+
+async def refresh_index() -> Optional[RiskIndex]:
+    global _index
+    async with _index_lock:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(MutualFund.scheme_code, MutualFund.name, MutualFund.category, MutualFund.risk_score)
+                .where(MutualFund.risk_score.is_not(None))
+            )
+            rows = [tuple(r) for r in result.all()]
+        if not rows:
+            return None
+        _index = await asyncio.to_thread(RiskIndex, rows)
+        return _index
+
+
+def get_index() -> Optional[RiskIndex]:
+    return _index
+
+
+async def _refresh_loop() -> None:
+    while True:
+        # warm-up may already have built it
+        if _index is None or time.time() - _index.built_at >= RISK_INDEX_TTL:
+            try:
+                await refresh_index()
+            except Exception as e:
+                print(f"⚠️ Risk index refresh failed: {e}")
+        # until risk scores exist (first NAV refresh still running) check more often
+        await asyncio.sleep(RISK_INDEX_TTL if _index is not None else min(RISK_INDEX_TTL, 60))
+
+
+def start() -> None:
+    global _refresher
+    if _refresher is None:
+        _refresher = asyncio.create_task(_refresh_loop())
+
+
+async def stop() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.cancel()
+        await asyncio.gather(_refresher, return_exceptions=True)
+        _refresher = None
+
+
+async def _on_refresh_complete(summary: dict) -> None:
+    await refresh_index()
+
+
+nav_refresh.run_hooks.append(_on_refresh_complete)
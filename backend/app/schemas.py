@@ -1,7 +1,7 @@
 # app/schemas.py
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 # ---------- User ----------
 class UserBase(BaseModel):
@@ -27,9 +27,11 @@ class UserOut(BaseModel):
 
 # ---------- Mutual Fund ----------
 class MutualFundBase(BaseModel):
+    scheme_code: Optional[str] = Field(default=None, max_length=20)
     name: str = Field(min_length=1, max_length=200)
     category: Optional[str] = Field(default=None, max_length=100)
     nav: Optional[float] = None
+    nav_date: Optional[date] = None
     owner_id: Optional[int] = None
 
 class MutualFundCreate(MutualFundBase):
@@ -44,3 +46,5 @@ class MutualFundUpdate(BaseModel):
 class MutualFundOut(MutualFundBase):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    risk_score: Optional[float] = None
+    risk_category: Optional[str] = None
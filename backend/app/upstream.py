@@ -0,0 +1,351 @@
+# app/upstream.py
+# Resilience layer for upstream HTTP calls (api.mfapi.in):
+#   - per-host concurrency limit
+#   - hedged requests: if the first attempt is slower than the observed p95,
+#     a second attempt is fired and whichever answers first wins. The delay
+#     counts from when the first attempt gets a connection slot, a hedge only
+#     fires when a slot is free, and hedges are capped to a share of requests
+#   - circuit breaker: after repeated failures calls fail fast (or are served
+#     from the last good response) until a trial request succeeds again.
+#     Last good responses are kept as raw bytes, bounded by total size
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter
+
+router = APIRouter()
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MAX_RATIO = float(os.getenv("UPSTREAM_HEDGE_MAX_RATIO", "0.05"))  # hedges per request
+HEDGE_BURST = 10  # most hedges that can be saved up during a quiet spell
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "30"))
+STALE_CACHE_SIZE = int(os.getenv("UPSTREAM_STALE_CACHE_SIZE", "512"))  # entries
+STALE_CACHE_BYTES = int(os.getenv("UPSTREAM_STALE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+
+# ---------------------------
+# Errors
+# ---------------------------
+class UpstreamError(Exception):
+    status_code = 502
+
+    def __init__(self, detail: str, status_code: Optional[int] = None):
+        super().__init__(detail)
+        self.detail = detail
+        if status_code is not None:
+            self.status_code = status_code
+
+
+class UpstreamUnavailable(UpstreamError):
+    # Network failure, timeout or open circuit
+    status_code = 503
+
+
+class UpstreamHTTPError(UpstreamError):
+    # Upstream answered with a non-2xx status; status_code is the upstream one
+    pass
+
+
+# ---------------------------
+# Latency tracking / circuit breaker
+# ---------------------------
+class LatencyTracker:
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            # let one trial request through at a time (a trial that never
+            # reported back, e.g. a cancelled request, expires after reset_timeout)
+            if self._trial_started is None or now - self._trial_started >= self.reset_timeout:
+                self._trial_started = now
+                return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_started = None
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class HostState:
+    def __init__(self):
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker()
+        self.semaphore = asyncio.Semaphore(UPSTREAM_MAX_CONCURRENCY)
+        self.in_flight = 0
+        self.hedge_tokens = 0.0
+        self.counters = {
+            "requests": 0,
+            "failures": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "hedges_skipped": 0,
+            "rejected": 0,
+            "served_stale": 0,
+        }
+
+    def hedge_delay(self, timeout: float) -> Optional[float]:
+        if len(self.latency) < HEDGE_MIN_SAMPLES:
+            return None
+        p = self.latency.percentile(HEDGE_PERCENTILE)
+        return min(max(p, HEDGE_MIN_DELAY), timeout)
+
+    def earn_hedge(self) -> None:
+        self.hedge_tokens = min(HEDGE_BURST, self.hedge_tokens + HEDGE_MAX_RATIO)
+
+    def take_hedge(self) -> bool:
+        # Checked when the hedge would fire: no hedging while every slot is
+        # taken (it would only queue behind the burst) or past the budget
+        if self.semaphore.locked() or self.hedge_tokens < 1:
+            self.counters["hedges_skipped"] += 1
+            return False
+        self.hedge_tokens -= 1
+        return True
+
+    def snapshot(self) -> dict:
+        p50 = self.latency.percentile(50)
+        p95 = self.latency.percentile(95)
+        return {
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "in_flight": self.in_flight,
+            "max_concurrency": UPSTREAM_MAX_CONCURRENCY,
+            "latency_ms": {
+                "samples": len(self.latency),
+                "p50": None if p50 is None else round(p50 * 1000, 1),
+                "p95": None if p95 is None else round(p95 * 1000, 1),
+            },
+            **self.counters,
+        }
+
+
+_hosts: dict[str, HostState] = {}
+_stale: "OrderedDict[str, bytes]" = OrderedDict()
+_stale_bytes = 0
+_client = None
+
+
+def _host_state(url: str) -> HostState:
+    host = urlsplit(url).netloc
+    state = _hosts.get(host)
+    if state is None:
+        state = _hosts[host] = HostState()
+    return state
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            timeout=UPSTREAM_TIMEOUT,
+            limits=httpx.Limits(max_connections=UPSTREAM_MAX_CONCURRENCY * 2),
+        )
+    return _client
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _remember(url: str, raw: bytes) -> None:
+    global _stale_bytes
+    if len(raw) > STALE_CACHE_BYTES:
+        return
+    old = _stale.pop(url, None)
+    if old is not None:
+        _stale_bytes -= len(old)
+    _stale[url] = raw
+    _stale_bytes += len(raw)
+    while len(_stale) > STALE_CACHE_SIZE or _stale_bytes > STALE_CACHE_BYTES:
+        _stale_bytes -= len(_stale.popitem(last=False)[1])
+
+
+# ---------------------------
+# Requests
+# ---------------------------
+async def _attempt(state: HostState, url: str, timeout: float, acquired: Optional[asyncio.Event] = None) -> bytes:
+    client = _get_client()
+    async with state.semaphore:
+        if acquired is not None:
+            acquired.set()
+        state.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, timeout=timeout)
+        finally:
+            state.in_flight -= 1
+        state.latency.record(time.perf_counter() - started)
+    if response.status_code >= 400:
+        raise UpstreamHTTPError(
+            f"Upstream returned HTTP {response.status_code} for {url}",
+            status_code=response.status_code,
+        )
+    return response.content
+
+
+def _is_final(exc: BaseException) -> bool:
+    # A 4xx is a real answer from a healthy upstream; don't wait for the hedge
+    return isinstance(exc, UpstreamHTTPError) and exc.status_code < 500
+
+
+async def _hedged_get(state: HostState, url: str, timeout: float) -> bytes:
+    state.earn_hedge()
+    acquired = asyncio.Event()
+    first = asyncio.create_task(_attempt(state, url, timeout, acquired))
+    delay = state.hedge_delay(timeout)
+    if delay is None:
+        return await first
+
+    pending = {first}
+    waiting = asyncio.ensure_future(acquired.wait())
+    try:
+        # time spent queued for a slot is not upstream latency, so the hedge
+        # delay starts once the first attempt holds the semaphore
+        await asyncio.wait({first, waiting}, return_when=asyncio.FIRST_COMPLETED)
+        if first.done():
+            done, pending = {first}, set()
+        else:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+        if not done and state.take_hedge():
+            state.counters["hedged"] += 1
+            second = asyncio.create_task(_attempt(state, url, timeout))
+            pending.add(second)
+
+        error: Optional[BaseException] = None
+        while True:
+            for task in done:
+                exc = task.exception()
+                if exc is None:
+                    if task is not first:
+                        state.counters["hedge_wins"] += 1
+                    return task.result()
+                if _is_final(exc):
+                    raise exc
+                error = exc
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiting.cancel()
+        for task in pending:
+            task.cancel()
+
+
+def _serve_stale(state: HostState, url: str) -> Any:
+    state.counters["served_stale"] += 1
+    _stale.move_to_end(url)
+    return json.loads(_stale[url])
+
+
+async def fetch_json(url: str, timeout: float = UPSTREAM_TIMEOUT, remember: bool = True) -> Any:
+    """
+    GET `url` and return the decoded JSON body through the resilience layer.
+    Raises UpstreamHTTPError for non-2xx answers and UpstreamUnavailable when
+    upstream cannot be reached (and no previous response is cached).
+    Bulk callers pass remember=False to bypass the last-good-response cache,
+    so they neither evict user-facing entries nor get served stale data.
+    """
+    import httpx
+
+    state = _host_state(url)
+    state.counters["requests"] += 1
+
+    if not state.breaker.allow():
+        state.counters["rejected"] += 1
+        if remember and url in _stale:
+            return _serve_stale(state, url)
+        raise UpstreamUnavailable(f"Upstream {urlsplit(url).netloc} is unavailable (circuit open)")
+
+    try:
+        raw = await _hedged_get(state, url, timeout)
+        payload = json.loads(raw)
+    except UpstreamHTTPError as exc:
+        if exc.status_code < 500:
+            state.breaker.record_success()
+            raise
+        failure: Exception = exc
+    except (httpx.HTTPError, ValueError) as exc:
+        failure = exc
+    else:
+        state.breaker.record_success()
+        if remember:
+            _remember(url, raw)
+        return payload
+
+    state.counters["failures"] += 1
+    state.breaker.record_failure()
+    if remember and url in _stale:
+        return _serve_stale(state, url)
+    if isinstance(failure, UpstreamHTTPError):
+        raise failure
+    raise UpstreamUnavailable(f"Error contacting upstream: {failure!r}")
+
+
+# ---------------------------
+# Monitoring
+# ---------------------------
+def status() -> dict:
+    return {
+        "hosts": {host: state.snapshot() for host, state in _hosts.items()},
+        "stale_cache_entries": len(_stale),
+        "stale_cache_bytes": _stale_bytes,
+    }
+
+
+@router.get("/status")
+async def get_upstream_status():
+    return status()
@@ -0,0 +1,39 @@
+# app/warmup.py
+import asyncio
+import os
+import time
+
+# Set WARMUP_ON_STARTUP=1 to preload heavy modules, the scheme catalog and
+# the risk index before the worker starts accepting requests.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0").lower() in ("1", "true", "yes")
+
+
+def _preload() -> dict:
+    timings = {}
+
+    t0 = time.perf_counter()
+    import numpy  # noqa: F401
+    import httpx  # noqa: F401
+    timings["imports_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    from app.catalog import load_catalog
+
+    # publishes the shared catalog if no worker has yet, then attaches it
+    t0 = time.perf_counter()
+    schemes = load_catalog()
+    timings["catalog_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    timings["schemes_count"] = len(schemes)
+    return timings
+
+
+async def warm_up() -> dict:
+    # the catalog download and the imports are blocking, keep them off the event loop
+    timings = await asyncio.to_thread(_preload)
+
+    from app.recommendations import refresh_index
+
+    t0 = time.perf_counter()
+    index = await refresh_index()
+    timings["risk_index_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    timings["risk_index_size"] = index.size if index else 0
+    return timings
@@ -0,0 +1,43 @@
+# benchmarks/backtest.py
+# Times the vectorized SIP / lump-sum backtest on a synthetic 20-year daily
+# NAV series.  Run from the backend folder:
+#   python -m benchmarks.backtest [--years 20] [--months 36]
+import argparse
+import time
+
+import numpy as np
+
+from app.backtest import simulate, summarize
+
+
+def synthetic_navs(years: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2000-01-03"), np.datetime64("2000-01-03") + years * 365, dtype="datetime64[D]")
+    # weekdays only, like a real NAV series
+    dates = dates[np.is_busday(dates)]
+    rets = rng.normal(0.12 / 252, 0.18 / np.sqrt(252), len(dates))
+    return dates, 10.0 * np.cumprod(1 + rets)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dates, navs = synthetic_navs(args.years)
+    for mode in ("sip", "lumpsum"):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            stats = summarize(simulate(dates, navs, args.months, 5000, mode))
+            best = min(best, time.perf_counter() - t0)
+        print(
+            f"{mode:8s} {stats['simulations']:6d} start dates x {args.months} months "
+            f"in {best * 1000:7.1f} ms  (median XIRR {stats['xirr_pct']['p50']}%)"
+        )
+
+
+if __name__ == "__main__":
+    main()
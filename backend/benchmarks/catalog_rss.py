@@ -0,0 +1,183 @@
+# benchmarks/catalog_rss.py
+# Per-worker memory of the scheme catalog: the old per-worker Mftool dict
+# expanded into per-fund dicts on every request, versus the shared mmap
+# catalog (app/catalog.py).  Each worker is a fresh process serving the same
+# /names, /search and /names_by_initial traffic with a few requests in
+# flight.  Uses a synthetic NAVAll list, no network.  Run from the backend
+# folder:
+#   python -m benchmarks.catalog_rss [--schemes 45000] [--workers 4]
+import argparse
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import time
+
+AMCS = [
+    "Aditya Birla Sun Life", "Axis", "Bandhan", "DSP", "Edelweiss", "Franklin India",
+    "HDFC", "ICICI Prudential", "Kotak", "Mirae Asset", "Motilal Oswal", "Nippon India",
+    "Parag Parikh", "quant", "SBI", "Sundaram", "Tata", "UTI",
+]
+KINDS = [
+    "Flexi Cap Fund", "Large Cap Fund", "Mid Cap Fund", "Small Cap Fund", "Liquid Fund",
+    "Overnight Fund", "Corporate Bond Fund", "Banking & PSU Debt Fund", "ELSS Tax Saver Scheme",
+    "Balanced Advantage Fund", "Nifty 50 Index Fund", "Fixed Maturity Plan Series",
+]
+PLANS = ["Growth", "IDCW", "IDCW Reinvestment", "Bonus"]
+QUERIES = ["flexi", "hdfc", "direct", "nifty 50", "zzz", "liquid fund - growth"]
+INITIALS = ["a", "h", "s", "q"]
+
+
+def synthetic_navall(n: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    lines = ["Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date", ""]
+    for i in range(n):
+        name = (
+            f"{rng.choice(AMCS)} {rng.choice(KINDS)} {rng.randint(1, 40)} - "
+            f"{rng.choice(['Direct', 'Regular'])} Plan - {rng.choice(PLANS)}"
+        )
+        lines.append(f"{100000 + i};INF{i:09d};-;{name};{rng.uniform(10, 900):.4f};17-Oct-2026")
+    return "\n".join(lines)
+
+
+def parse_like_mftool(text: str) -> dict:
+    # same parsing as Mftool.get_scheme_codes()
+    scheme_info = {}
+    for scheme_data in text.split("\n"):
+        if ";" in scheme_data:
+            scheme = scheme_data.split(";")
+            scheme_info[scheme[0]] = f"{scheme[3]} - {scheme[5]}" if len(scheme) > 5 else scheme[3]
+    return scheme_info
+
+
+# ---------- The previous endpoint bodies ----------
+def old_names(codes: dict, page: int) -> list:
+    funds = [{"code": code, "name": name.replace("Scheme", "").strip()} for code, name in codes.items()]
+    return funds[(page - 1) * 20:page * 20], funds
+
+
+def old_search(codes: dict, q: str) -> list:
+    return [
+        {"code": code, "name": name.replace("Scheme", "").strip()}
+        for code, name in codes.items()
+        if q.lower() in name.lower()
+    ][:10]
+
+
+def old_initial(codes: dict, initial: str) -> list:
+    return [
+        {"code": code, "name": name.replace("Scheme", "").strip()}
+        for code, name in codes.items()
+        if name and name.lower().startswith(initial.lower())
+    ]
+
+
+# ---------- Worker side ----------
+def memory() -> tuple[float, float]:
+    """(RSS, PSS) of this process in MiB; PSS splits shared pages between mappers."""
+    rss = pss = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss / 1024, pss / 1024
+
+
+def worker(mode: str, navall_path: str, catalog_path: str, in_flight: int, rounds: int, out) -> None:
+    from app.catalog import SchemeCatalog
+
+    before = memory()
+    held = []
+    if mode == "dict":
+        with open(navall_path) as f:
+            codes = parse_like_mftool(f.read())
+        for r in range(rounds):
+            # the previous code kept the full per-fund list alive per request
+            page, funds = old_names(codes, r + 1)
+            held.append((page, funds, old_search(codes, QUERIES[r % len(QUERIES)]),
+                         old_initial(codes, INITIALS[r % len(INITIALS)])))
+            held = held[-in_flight:]
+    else:
+        catalog = SchemeCatalog.attach(catalog_path)
+        for r in range(rounds):
+            held.append((catalog.rows(r * 20, r * 20 + 20), catalog.search(QUERIES[r % len(QUERIES)]),
+                         catalog.starting_with(INITIALS[r % len(INITIALS)])))
+            held = held[-in_flight:]
+    out.put((mode, os.getpid(), before, memory()))
+
+
+def check_equivalence(codes: dict, catalog) -> None:
+    real = {c: n for c, n in codes.items() if c.isdigit()}
+    _, funds = old_names(real, 1)
+    assert catalog.rows() == funds, "names differ"
+    for q in QUERIES + ["", "SCHEME", "plan - g"]:
+        assert catalog.search(q) == old_search(real, q), f"search {q!r} differs"
+    for ch in INITIALS + ["H", "x"]:
+        assert catalog.starting_with(ch) == old_initial(real, ch), f"initial {ch!r} differs"
+    for code in ("100000", "100123", str(99999 + len(real)), "1", "abc"):
+        i = catalog.index_of(code)
+        assert (i is not None and catalog.row(i)["code"] == code) == (code in real), f"lookup {code} differs"
+
+
+def run(mode: str, workers: int, navall_path: str, catalog_path: str, in_flight: int, rounds: int) -> list:
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, navall_path, catalog_path, in_flight, rounds, out))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schemes", type=int, default=45000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--in-flight", type=int, default=4, help="concurrent requests held per worker")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.catalog import SchemeCatalog, publish
+
+    with tempfile.TemporaryDirectory() as tmp:
+        navall_path = os.path.join(tmp, "NAVAll.txt")
+        catalog_path = os.path.join(tmp, "catalog.bin")
+        text = synthetic_navall(args.schemes)
+        with open(navall_path, "w") as f:
+            f.write(text)
+
+        codes = parse_like_mftool(text)
+        t0 = time.perf_counter()
+        size = publish(codes, catalog_path)
+        publish_ms = (time.perf_counter() - t0) * 1000
+        catalog = SchemeCatalog.attach(catalog_path)
+        check_equivalence(codes, catalog)
+        print(f"{len(catalog)} schemes, catalog {size / 1024:.0f} KiB, published in {publish_ms:.0f} ms, "
+              f"results identical to the previous endpoints")
+
+        for label, q in (("search 'hdfc'", "hdfc"), ("search 'zzz' (full scan)", "zzz")):
+            t0 = time.perf_counter()
+            for _ in range(100):
+                old_search(codes, q)
+            old_ms = (time.perf_counter() - t0) * 10
+            t0 = time.perf_counter()
+            for _ in range(100):
+                catalog.search(q)
+            new_ms = (time.perf_counter() - t0) * 10
+            print(f"{label:<26} dict {old_ms:7.2f} ms   catalog {new_ms:7.3f} ms")
+
+        print(f"\n{args.workers} workers, {args.in_flight} requests in flight each (MiB)")
+        print(f"{'mode':<8} {'RSS before':>11} {'RSS after':>10} {'delta':>7} {'PSS after':>10}")
+        for mode in ("dict", "shared"):
+            rows = run(mode, args.workers, navall_path, catalog_path, args.in_flight, args.rounds)
+            for _, _, (rss0, _), (rss1, pss1) in rows:
+                print(f"{mode:<8} {rss0:11.1f} {rss1:10.1f} {rss1 - rss0:7.1f} {pss1:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
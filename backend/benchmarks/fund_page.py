@@ -0,0 +1,102 @@
+# benchmarks/fund_page.py
+# Fund page load: the three calls FundDetail.jsx used to make versus the
+# composite /api/funds/page endpoint. mfapi.in is replaced by a local fake
+# that serves a synthetic history after a fixed delay and counts downloads.
+# /api/funds/details went through mftool, which downloads the same mfapi.in
+# URL; it is stood in for by one more fake download.  Run from the backend
+# folder:
+#   python -m benchmarks.fund_page [--years 15] [--latency 0.3]
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./dev.db")
+os.environ["CATALOG_PATH"] = os.path.join(tempfile.mkdtemp(), "catalog.bin")
+
+
+def synthetic_payload(code: str, years: int) -> dict:
+    import numpy as np
+
+    rng = np.random.default_rng(3)
+    days = np.arange(np.datetime64(date.today() - timedelta(days=365 * years)), np.datetime64(date.today()))
+    days = days[np.is_busday(days)]
+    navs = 10 * np.cumprod(1 + rng.normal(0.0004, 0.01, len(days)))
+    data = [
+        {"date": d.astype(date).strftime("%d-%m-%Y"), "nav": f"{v:.4f}"}
+        for d, v in zip(days[::-1], navs[::-1])
+    ]
+    meta = {
+        "fund_house": "Demo Mutual Fund", "scheme_type": "Open Ended Schemes",
+        "scheme_category": "Equity Scheme - Flexi Cap Fund", "scheme_code": int(code),
+        "scheme_name": f"Demo Flexi Cap Fund {code} - Direct Plan - Growth",
+    }
+    return {"meta": meta, "data": data, "status": "SUCCESS"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated mfapi.in latency (s)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    import app.main
+    from app import catalog, upstream
+
+    code = "100001"
+    payload = synthetic_payload(code, args.years)
+    downloads = []
+
+    async def fake_fetch_json(url, timeout=None):
+        downloads.append(url)
+        await asyncio.sleep(args.latency)
+        return payload
+
+    upstream.fetch_json = fake_fetch_json
+    catalog.publish({code: payload["meta"]["scheme_name"]}, catalog.CATALOG_PATH)
+
+    async def old_flow(client):
+        # FundDetail fired its three requests in parallel
+        await asyncio.gather(
+            client.get(f"/api/funds/nav_history/{code}"),
+            fake_fetch_json(f"https://api.mfapi.in/mf/{code}"),  # mftool details
+            client.get(f"/api/mutual-funds/risk/{code}"),
+        )
+
+    async def new_flow(client, include="details,history,risk"):
+        r = await client.get(f"/api/funds/page/{code}", params={"include": include})
+        assert r.status_code == 200, r.text
+        return r
+
+    async def timed(label, flow):
+        import httpx
+
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await flow(client)  # warm imports
+            downloads.clear()
+            t0 = time.perf_counter()
+            for _ in range(args.runs):
+                await flow(client)
+            ms = (time.perf_counter() - t0) / args.runs * 1000
+        print(f"{label:<34} {len(downloads) / args.runs:.0f} upstream downloads, {ms:7.1f} ms per page")
+
+    with TestClient(app.main.app) as client:
+        page = client.get(f"/api/funds/page/{code}").json()
+        risk = client.get(f"/api/mutual-funds/risk/{code}").json()
+        assert page["risk"] == risk["risk"], "risk differs from /api/mutual-funds/risk"
+        assert len(page["nav_history"]) == len(payload["data"])
+        print(f"{len(payload['data'])} NAVs; page risk identical to the risk endpoint")
+
+    asyncio.run(timed("before: history + details + risk", old_flow))
+    asyncio.run(timed("after:  /page", new_flow))
+    asyncio.run(timed("after:  /page?include=details,risk", lambda c: new_flow(c, "details,risk")))
+
+
+if __name__ == "__main__":
+    main()
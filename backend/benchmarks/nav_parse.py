@@ -0,0 +1,47 @@
+# benchmarks/nav_parse.py
+# NAV history parsing + risk math: the former pandas implementation
+# (tests/pandas_reference.py) against the NumPy one in app/fundDetail.py.
+# Timing only; equivalence is covered by tests/test_nav_parse.py.  Run from
+# the backend folder:
+#   python -m benchmarks.nav_parse [--rows 4000] [--runs 50]
+import argparse
+import time
+
+from app.fundDetail import _parse_nav_arrays, _riskometer_from_nav
+from tests.pandas_reference import parse_nav_series_pandas, riskometer_pandas, synthetic_history, variants
+
+
+def bench(fn, runs: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=4000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    base = synthetic_history(args.rows)
+    ref = parse_nav_series_pandas(base)
+    _, navs = _parse_nav_arrays(base)
+    shuffled = variants(base)["shuffled"]
+
+    print(f"{args.rows} rows, mean of {args.runs} runs (ms)")
+    print(f"{'':<22} {'pandas':>8} {'numpy':>8} {'speed-up':>9}")
+    for label, slow, fast in (
+        ("parse", lambda: parse_nav_series_pandas(base), lambda: _parse_nav_arrays(base)),
+        ("parse (shuffled)", lambda: parse_nav_series_pandas(shuffled), lambda: _parse_nav_arrays(shuffled)),
+        ("risk", lambda: riskometer_pandas(ref), lambda: _riskometer_from_nav(navs)),
+        ("parse + risk", lambda: riskometer_pandas(parse_nav_series_pandas(base)),
+         lambda: _riskometer_from_nav(_parse_nav_arrays(base)[1])),
+    ):
+        a, b = bench(slow, args.runs), bench(fast, args.runs)
+        print(f"{label:<22} {a:8.2f} {b:8.2f} {a / b:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
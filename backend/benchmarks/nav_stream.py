@@ -0,0 +1,154 @@
+# benchmarks/nav_stream.py
+# Live NAV stream (app/nav_stream.py):
+#   1. in-process hub: fan-out throughput with many subscribers, checks that
+#      every subscriber gets exactly the events of its schemes and that a
+#      subscriber that never reads is dropped without affecting the others;
+#   2. a real uvicorn worker holding thousands of idle SSE connections fed by
+#      the fake NAV source: server RSS per connection and how long one event
+#      takes to reach every client.
+# No network or database needed.  Run from the backend folder:
+#   python -m benchmarks.nav_stream [--connections 5000]
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./dev.db")
+
+CODES = [str(100000 + i) for i in range(2000)]
+
+
+# ---------- 1. Hub ----------
+def hub_bench(subscribers: int, per_sub: int, days: int = 3) -> None:
+    from app.nav_stream import NavHub
+
+    rng = random.Random(1)
+    hub = NavHub(queue_size=64, max_subscribers=subscribers + 1)
+    wanted = [rng.sample(CODES, per_sub) for _ in range(subscribers)]
+    subs = [hub.subscribe(codes) for codes in wanted]
+    slow = hub.subscribe(CODES[:100])
+    received = [[] for _ in subs]
+
+    day = date(2026, 10, 1)
+    elapsed = 0.0
+    for d in range(days):
+        day += timedelta(days=1)
+        t0 = time.perf_counter()
+        for i, code in enumerate(CODES):
+            hub.observe(code, day, 100.0 + d + i / 1000)
+        elapsed += time.perf_counter() - t0
+        # fast subscribers drain between days, the slow one never does
+        for sub, got in zip(subs, received):
+            while not sub.queue.empty():
+                got.append(sub.queue.get_nowait())
+
+    for codes, got in zip(wanted, received):
+        schemes = sorted(json.loads(frame.split(b"data: ", 1)[1])["scheme"] for frame in got)
+        assert schemes == sorted(codes * days), "subscriber got the wrong events"
+    stats = hub.stats()
+    assert stats["dropped_slow_consumers"] == 1 and slow.closed, stats
+    assert not any(s.closed for s in subs)
+    print(f"hub: {subscribers} subscribers x {per_sub} schemes, {stats['published']} NAVs -> "
+          f"{stats['delivered']} deliveries in {elapsed * 1000:.0f} ms "
+          f"({stats['delivered'] / elapsed / 1e6:.2f} M/s); exact per-subscriber delivery, "
+          f"slow consumer dropped, others intact")
+
+
+# ---------- 2. Server ----------
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def open_stream(port: int, codes: list[str]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /api/nav-stream?codes={','.join(codes)} HTTP/1.1\r\n"
+        f"Host: localhost\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    while b"event: ready" not in await reader.readline():
+        pass
+    return reader, writer
+
+
+async def first_nav(reader, code: str) -> float:
+    marker = f'"scheme":"{code}"'.encode()
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("stream closed")
+        if marker in line:
+            return time.perf_counter()
+
+
+async def server_bench(connections: int, port: int) -> None:
+    env = dict(os.environ, NAV_STREAM_FAKE_INTERVAL="3", NAV_STREAM_POLL="0",
+               NAV_STREAM_MAX_SUBSCRIBERS=str(connections + 10))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--backlog", "4096"],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        time.sleep(0.5)
+        before = rss_mib(server.pid)
+
+        rng = random.Random(2)
+        streams = []
+        t0 = time.perf_counter()
+        for i in range(0, connections, 250):
+            batch = [open_stream(port, [CODES[0]] + rng.sample(CODES[1:], 4))
+                     for _ in range(min(250, connections - i))]
+            streams += await asyncio.gather(*batch)
+        connect_s = time.perf_counter() - t0
+        await asyncio.sleep(1)
+        after = rss_mib(server.pid)
+
+        # every client subscribes to CODES[0]; time one fake tick reaching all
+        times = await asyncio.gather(*(first_nav(r, CODES[0]) for r, _ in streams))
+        spread = sorted(t - min(times) for t in times)
+
+        print(f"server: {connections} idle SSE connections opened in {connect_s:.1f}s; "
+              f"worker RSS {before:.1f} -> {after:.1f} MiB "
+              f"({(after - before) * 1024 / connections:.1f} KiB per connection)")
+        print(f"        one NAV event reached all {connections} clients within "
+              f"{spread[-1] * 1000:.0f} ms (median {statistics.median(spread) * 1000:.0f} ms, "
+              f"p99 {spread[int(len(spread) * 0.99) - 1] * 1000:.0f} ms after the first)")
+        for _, writer in streams:
+            writer.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--per-sub", type=int, default=5)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    hub_bench(args.subscribers, args.per_sub)
+    asyncio.run(server_bench(args.connections, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/startup.py
+# Measures cold import time of app.main and time-to-first-request, each in a
+# fresh interpreter.  Run from the backend folder:
+#   python -m benchmarks.startup [--runs 5] [--warmup]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/")
+t2 = time.perf_counter()
+print(f"{(t1 - t0) * 1000:.1f} {(t2 - t0) * 1000:.1f}")
+"""
+
+
+def run_once(warmup: bool) -> tuple[float, float]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./dev.db")
+    env["WARMUP_ON_STARTUP"] = "1" if warmup else "0"
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_ms, first_request_ms = out.stdout.strip().splitlines()[-1].split()
+    return float(import_ms), float(first_request_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="enable WARMUP_ON_STARTUP")
+    args = parser.parse_args()
+
+    results = [run_once(args.warmup) for _ in range(args.runs)]
+    imports = [r[0] for r in results]
+    first = [r[1] for r in results]
+    print(f"import app.main      median {statistics.median(imports):8.1f} ms")
+    print(f"time to first request median {statistics.median(first):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
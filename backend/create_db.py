@@ -1,7 +1,21 @@
+# create_db.py
+# Explicit schema creation / upgrade step (no longer run on every app startup):
+#   python create_db.py
+# Safe to re-run; an existing mutualfunds table gets the columns and unique
+# index the bulk loader and NAV refresh need.
+import asyncio
 
-from app.database import engine, Base
-import app.models as models
+from app.database import engine
+from app.models import init_models
 
-Base.metadata.create_all(bind=engine)
-print("DB initialized (dev.db)")
 
+async def main() -> None:
+    changed = await init_models()
+    if changed:
+        print(f"✅ mutualfunds upgraded: {', '.join(changed)}")
+    # the aiosqlite/asyncpg pool keeps the loop alive until it is disposed
+    await engine.dispose()
+
+
+asyncio.run(main())
+print("DB initialized")
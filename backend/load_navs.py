@@ -0,0 +1,42 @@
+# load_navs.py
+# Offline bulk loader for AMFI NAV flat files (run create_db.py first):
+#   python load_navs.py NAVAll.txt
+#   python load_navs.py nav_history_2023.txt nav_history_2024.txt --batch-size 10000
+import argparse
+import asyncio
+
+from app.amfi_loader import DEFAULT_BATCH_SIZE, iter_nav_file, load_records
+from app.database import AsyncSessionLocal, engine
+
+
+def _progress(rows: int, elapsed: float) -> None:
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"  {rows:>10,} rows  {elapsed:8.1f}s  {rate:>10,.0f} rows/s", flush=True)
+
+
+async def main(paths: list[str], batch_size: int, with_history: bool) -> None:
+    async with AsyncSessionLocal() as session:
+        for path in paths:
+            print(f"Loading {path}")
+            stats = await load_records(
+                session,
+                iter_nav_file(path),
+                batch_size=batch_size,
+                with_history=with_history,
+                progress=_progress,
+            )
+            print(f"✅ {path}: {stats['rows']:,} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load AMFI NAV text files")
+    parser.add_argument("paths", nargs="+", help="NAVAll.txt or NAV history report files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="only update the mutualfunds table, skip nav_history rows",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.paths, args.batch_size, not args.no_history))
@@ -0,0 +1,16 @@
+# tests/conftest.py
+# Run from the backend folder:  python -m pytest -q
+import os
+import sys
+import tempfile
+
+# app.database builds its engine at import time; point it at a throwaway
+# SQLite file before any app module is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURES, name)
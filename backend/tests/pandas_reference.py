@@ -0,0 +1,83 @@
+# tests/pandas_reference.py
+# The former pandas NAV parsing + risk code, kept verbatim as the reference
+# for app/fundDetail.py, and the histories both are compared on. Used by
+# test_nav_parse.py and benchmarks/nav_parse.py.
+import random
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.fundDetail import _risk_result
+
+
+def parse_nav_series_pandas(history: list[dict]) -> pd.Series:
+    df = pd.DataFrame(history)
+    if df.empty or "nav" not in df or "date" not in df:
+        raise ValueError("Invalid NAV history format")
+    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
+    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
+    df = df.dropna(subset=["date", "nav"]).sort_values("date")
+    return pd.Series(df["nav"].values, index=df["date"])
+
+
+def risk_metrics_pandas(navs: pd.Series, freq: str = "D") -> tuple[float, float, float]:
+    rets = navs.pct_change().dropna()
+    if len(rets) < 10:
+        raise ValueError("Insufficient NAV history to compute risk")
+    ann_factor = 252 if freq == "D" else 12
+    vol = rets.std(ddof=1) * np.sqrt(ann_factor) * 100
+    downside = rets[rets < 0]
+    dd = np.sqrt((downside ** 2).sum() / len(rets)) * np.sqrt(ann_factor) * 100
+    cum = (1 + rets).cumprod()
+    running_max = cum.cummax()
+    mdd = ((cum - running_max) / running_max).min() * 100
+    return float(vol), float(dd), float(mdd)
+
+
+def riskometer_pandas(navs: pd.Series) -> dict:
+    return _risk_result(*risk_metrics_pandas(navs))
+
+
+# ---------- Inputs ----------
+def synthetic_history(rows: int, seed: int = 0) -> list[dict]:
+    """mfapi.in shaped: latest first, business days, 4-5 decimal strings."""
+    rng = np.random.default_rng(seed)
+    end = np.datetime64(date(2026, 10, 16))
+    days = np.busday_offset(end, -np.arange(rows), roll="backward")
+    navs = 10 * np.cumprod(1 + rng.normal(0.0004, 0.012, rows))[::-1]
+    return [
+        {"date": d.astype(date).strftime("%d-%m-%Y"), "nav": f"{v:.{4 + i % 2}f}"}
+        for i, (d, v) in enumerate(zip(days, navs))
+    ]
+
+
+MALFORMED = [
+    ("date", "31-02-2024"), ("date", "00-01-2024"), ("date", "15-13-2024"), ("date", "2024-01-15"),
+    ("date", "1-2-2024"), ("date", "7-07-2021"), ("date", "05-06-2019 "), ("date", None), ("date", ""),
+    ("date", "01-01-1500"), ("date", "01-01-0000"), ("date", "29-02-2023"), ("date", "29-02-2024"),
+    ("date", "01-01-2024,"), ("nav", "N.A."), ("nav", ""), ("nav", None), ("nav", "1,234.5"),
+    ("nav", "  12.5 "), ("nav", 17), ("nav", "nan"), ("nav", "1_000"), ("nav", "١٢٣"),
+    ("nav", "１２.５"), ("nav", "1e400"), ("nav", " inf "), ("nav", "\xa012.5"),
+]
+
+
+def variants(base: list[dict]) -> dict:
+    rng = random.Random(5)
+    shuffled = base[:]
+    rng.shuffle(shuffled)
+    messy = [dict(r) for r in base]
+    for i, (field, value) in enumerate(MALFORMED):
+        messy[5 + i * 37][field] = value
+    no_nav_key = [dict(r) for r in base[:50]]
+    del no_nav_key[3]["nav"]
+    duplicated = base[:300] + base[100:150]
+    return {
+        "mfapi (latest first)": base,
+        "oldest first": base[::-1],
+        "shuffled": shuffled,
+        "duplicate dates": duplicated,
+        "malformed rows": messy,
+        "missing key in one row": no_nav_key,
+        "short (5 rows)": base[:5],
+    }
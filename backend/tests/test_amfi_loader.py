@@ -0,0 +1,173 @@
+# tests/test_amfi_loader.py
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import amfi_loader
+from app.amfi_loader import NavRecord, iter_nav_file, iter_nav_records, load_records
+from app.database import Base
+from app.models import MutualFund, NavHistory
+from tests.conftest import fixture_path
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+def test_navall_header_mapping_and_categories():
+    records = list(iter_nav_file(fixture_path("NAVAll.txt")))
+    assert [r.scheme_code for r in records] == ["119551", "120438", "119018"]
+    assert records[0] == NavRecord(
+        "119551",
+        "Aditya Birla Sun Life Banking & PSU Debt Fund - DIRECT - IDCW",
+        "Debt Scheme - Banking and PSU Fund",
+        105.3257,
+        date(2026, 10, 17),
+    )
+    # the category carries over the AMC name line to the next fund house
+    assert records[1].category == "Debt Scheme - Banking and PSU Fund"
+    assert records[2].category == "Equity Scheme - Large Cap Fund"
+
+
+def test_navall_skips_na_bad_dates_and_short_rows():
+    codes = {r.scheme_code for r in iter_nav_file(fixture_path("NAVAll.txt"))}
+    assert "119552" not in codes  # N.A. NAV
+    assert "119019" not in codes  # 31-Sep-2026
+    assert "119020" not in codes  # missing NAV and date columns
+
+
+def test_history_report_columns_differ_from_navall():
+    records = list(iter_nav_file(fixture_path("nav_history_report.txt")))
+    assert [(r.scheme_code, r.nav_date, r.nav) for r in records] == [
+        ("122639", date(2026, 10, 14), 78.1120),
+        ("122639", date(2026, 10, 15), 78.4531),
+        ("122639", date(2026, 10, 17), 78.9012),
+        ("120824", date(2026, 10, 14), 41.2210),
+        ("120824", date(2026, 10, 17), 41.2359),  # dd-mm-yyyy is accepted too
+    ]
+    assert records[0].category == "Equity Scheme - Flexi Cap Fund"
+    assert records[-1].category == "Debt Scheme - Liquid Fund"
+
+
+def test_unrecognised_header_raises():
+    with pytest.raises(ValueError, match="Unrecognised AMFI header"):
+        list(iter_nav_records(["Code;Name;NAV", "1;x;2.0"]))
+
+
+# ---------------------------
+# Loading
+# ---------------------------
+def _run_with_session(tmp_path, fn):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/load.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                return await fn(session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def _funds(session) -> dict:
+    rows = await session.execute(select(MutualFund.scheme_code, MutualFund.nav, MutualFund.nav_date))
+    return {code: (float(nav), d) for code, nav, d in rows.all()}
+
+
+async def _history(session) -> list:
+    rows = await session.execute(
+        select(NavHistory.scheme_code, NavHistory.nav_date, NavHistory.nav).order_by(
+            NavHistory.scheme_code, NavHistory.nav_date
+        )
+    )
+    return [(code, d, float(nav)) for code, d, nav in rows.all()]
+
+
+def test_load_records_upserts_latest_and_history(tmp_path):
+    async def fn(session):
+        stats = await load_records(session, iter_nav_file(fixture_path("nav_history_report.txt")), batch_size=2)
+        return stats, await _funds(session), await _history(session)
+
+    stats, funds, history = _run_with_session(tmp_path, fn)
+    assert stats["rows"] == 5
+    assert funds == {
+        "122639": (78.9012, date(2026, 10, 17)),
+        "120824": (41.2359, date(2026, 10, 17)),
+    }
+    assert len(history) == 5 and history[0] == ("120824", date(2026, 10, 14), 41.2210)
+
+
+def test_older_nav_never_overwrites_newer(tmp_path):
+    newer = NavRecord("122639", "Flexi Cap", "Equity", 80.0, date(2026, 10, 20))
+    older = NavRecord("122639", "Flexi Cap", "Equity", 70.0, date(2026, 10, 1))
+
+    async def fn(session):
+        await load_records(session, [newer])
+        # a later batch carrying an older history row
+        await load_records(session, [older])
+        return await _funds(session), await _history(session)
+
+    funds, history = _run_with_session(tmp_path, fn)
+    assert funds == {"122639": (80.0, date(2026, 10, 20))}
+    assert [h[1] for h in history] == [date(2026, 10, 1), date(2026, 10, 20)]
+
+
+def test_batches_are_split_by_bind_parameter_count(tmp_path, monkeypatch):
+    # 30 parameters per statement: 6 fund rows or 10 history rows
+    monkeypatch.setattr(amfi_loader, "MAX_BIND_PARAMS", 30)
+    records = [
+        NavRecord(str(100000 + i), f"Fund {i}", None, 10.0 + i, date(2026, 10, 1 + i % 5))
+        for i in range(47)
+    ]
+
+    sizes = []
+
+    def count_params(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            sizes.append(len(parameters))
+
+    async def fn(session):
+        event.listen(session.bind.sync_engine, "before_cursor_execute", count_params)
+        await load_records(session, records, batch_size=1000)
+        return await _funds(session), await _history(session)
+
+    funds, history = _run_with_session(tmp_path, fn)
+    assert max(sizes) <= 30 and len(sizes) == 8 + 5
+    assert len(funds) == 47 and len(history) == 47
+    assert funds["100046"] == (56.0, date(2026, 10, 2))
+
+
+def test_upgrade_brings_a_legacy_mutualfunds_table_up_to_date(tmp_path):
+    from sqlalchemy import text
+
+    from app.models import upgrade_mutualfunds
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        async with engine.begin() as conn:
+            # the table as the first release created it
+            await conn.execute(text(
+                "CREATE TABLE mutualfunds (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+                "category VARCHAR(50), nav NUMERIC(10, 2), created_at DATETIME)"
+            ))
+            await conn.execute(text("INSERT INTO mutualfunds (name, nav) VALUES ('Old Fund', 12.5)"))
+            await conn.run_sync(Base.metadata.create_all)  # leaves mutualfunds alone
+            first = await conn.run_sync(upgrade_mutualfunds)
+            second = await conn.run_sync(upgrade_mutualfunds)
+        try:
+            async with sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                await load_records(session, iter_nav_file(fixture_path("NAVAll.txt")))
+                return first, second, await _funds(session)
+        finally:
+            await engine.dispose()
+
+    first, second, funds = asyncio.run(run())
+    assert first == ["add scheme_code", "add nav_date", "add risk_score", "add risk_category",
+                     "add unique index on scheme_code"]
+    assert second == []
+    assert funds["119018"] == (1224.518, date(2026, 10, 17)) and len(funds) == 4
@@ -0,0 +1,69 @@
+# tests/test_backtest.py
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app import backtest, upstream
+
+
+def _daily(start: str, days: int, navs) -> tuple[np.ndarray, np.ndarray]:
+    dates = np.datetime64(start, "D") + np.arange(days)
+    return dates, np.asarray(navs, dtype=np.float64)
+
+
+def test_xirr_of_a_single_pair_is_the_cagr():
+    # 100 out, 121 back two years later: 10% a year
+    rate = backtest.xirr(np.array([[0.0, 2.0]]), np.array([[-100.0, 121.0]]))
+    assert rate[0] == pytest.approx(0.10, abs=1e-9)
+
+    # and the lump-sum closed form agrees with the solver on every start date
+    dates, navs = _daily("2020-01-01", 900, 10 * 1.0004 ** np.arange(900))
+    result = backtest.simulate(dates, navs, 12, 1000.0, mode="lumpsum")
+    schedule = backtest._monthly_schedule(result["start_dates"], 12, ends_only=True)
+    years = (schedule[:, 1] - schedule[:, 0]).astype(np.float64) / 365.0
+    flows = np.column_stack([-result["invested"], result["value"]])
+    solved = backtest.xirr(np.column_stack([np.zeros_like(years), years]), flows)
+    np.testing.assert_allclose(solved, result["xirr"], atol=1e-8)
+
+
+def test_constant_nav_sip_returns_nothing():
+    dates, navs = _daily("2021-03-01", 500, np.full(500, 25.0))
+    result = backtest.simulate(dates, navs, 6, 5000.0, mode="sip")
+    assert len(result["xirr"]) > 0
+    np.testing.assert_allclose(result["value"], result["invested"])
+    np.testing.assert_allclose(result["xirr"], 0.0, atol=1e-9)
+
+    stats = backtest.summarize(result)
+    assert stats["xirr_pct"]["mean"] == 0.0 and stats["probability_of_loss_pct"] == 0.0
+
+
+def test_installments_clip_to_the_end_of_short_months():
+    starts = np.array(["2023-01-31", "2024-01-31", "2024-03-15"], dtype="datetime64[D]")
+    schedule = backtest._monthly_schedule(starts, 3)
+    assert schedule.astype(str).tolist() == [
+        ["2023-01-31", "2023-02-28", "2023-03-31", "2023-04-30"],
+        ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"],
+        ["2024-03-15", "2024-04-15", "2024-05-15", "2024-06-15"],
+    ]
+    ends = backtest._monthly_schedule(starts, 3, ends_only=True)
+    np.testing.assert_array_equal(ends, schedule[:, [0, -1]])
+
+
+def test_too_short_a_history_is_rejected():
+    dates, navs = _daily("2024-01-01", 40, np.linspace(10, 11, 40))
+    with pytest.raises(ValueError, match="Not enough NAV history"):
+        backtest.simulate(dates, navs, 2, 1000.0)
+
+
+def test_too_short_a_history_is_a_400(monkeypatch):
+    history = [{"date": f"{d:02d}-01-2024", "nav": f"{10 + d / 100:.4f}"} for d in range(31, 0, -1)]
+
+    async def fake_fetch_json(url, timeout=None, remember=True):
+        return {"meta": {"scheme_name": "Short Fund"}, "data": history}
+
+    monkeypatch.setattr(upstream, "fetch_json", fake_fetch_json)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(backtest.backtest_fund("100001", mode="sip", amount=1000, months=12))
+    assert exc.value.status_code == 400 and "12-month" in exc.value.detail
@@ -0,0 +1,113 @@
+# tests/test_catalog.py
+import pytest
+
+from app import catalog
+
+# Mftool.get_scheme_codes() shape, NAVAll header row included
+SCHEMES = {
+    "Scheme Code": "Scheme Name",
+    "119551": "Aditya Birla Sun Life Banking & PSU Debt Fund - DIRECT - IDCW",
+    "120438": "Axis Bluechip Fund - Direct Plan - Growth",
+    "100027": "Grindlays Super Saver Income Fund-GSSIF-Half Yearly Dividend",
+    "118989": "HDFC Mid-Cap Opportunities Fund - Growth Option - Direct Plan",
+    "147622": "Nippon India Nivesh Lakshya Fund - Direct Plan - Growth growth option",
+    "100033": "Aditya Birla Sun Life Equity Advantage Fund - Regular Scheme - Growth",
+    "150001": "Ünïcode Fönd Ça Scheme - Direct",
+    "150002": "ÇAPITAL Protection Oriented Scheme - Series 1",
+    "150003": "Fundo Ångström - Growth",
+    "100001": "axis Liquid Fund",
+    "90001": "",
+}
+
+
+def _old_rows(keep) -> list[dict]:
+    # what the endpoints built before the catalog existed, header row dropped
+    return [
+        {"code": code, "name": name.replace("Scheme", "").strip()}
+        for code, name in SCHEMES.items()
+        if code.isdigit() and keep(name)
+    ]
+
+
+@pytest.fixture(scope="module")
+def cat():
+    return catalog.SchemeCatalog(catalog.pack(SCHEMES))
+
+
+def test_header_row_is_dropped(cat):
+    assert len(cat) == len(SCHEMES) - 1
+    assert cat.rows() == _old_rows(lambda name: True)
+    assert cat.search("scheme code") == [] and cat.index_of("Scheme Code") is None
+
+
+@pytest.mark.parametrize("q", ["fund", "axis", "AXIS", "growth", "direct plan", "scheme", "Scheme -", "ü", "ÇA",
+                               "ångström", "-gssif-", "f", "nope", "d - d"])
+def test_search_matches_the_old_substring_filter(cat, q):
+    expected = _old_rows(lambda name: q.lower() in name.lower())
+    assert cat.search(q, limit=None) == expected
+    assert cat.search(q) == expected[:10]
+    assert cat.search(q, limit=2) == expected[:2]
+
+
+@pytest.mark.parametrize("initial", ["a", "A", "g", "h", "n", "ü", "ç", "f", "z"])
+def test_starting_with_matches_the_old_prefix_filter(cat, initial):
+    expected = _old_rows(lambda name: name and name.lower().startswith(initial.lower()))
+    assert cat.starting_with(initial) == expected
+
+
+def test_prefix_and_substring_hits_differ(cat):
+    # "fund" is in most names but starts only one of them
+    assert [r["code"] for r in cat.starting_with("fund")] == ["150003"]
+    assert len(cat.search("fund", limit=None)) > 5
+    assert [r["code"] for r in cat.starting_with("axis")] == ["120438", "100001"]
+
+
+def test_a_name_matching_twice_is_returned_once(cat):
+    # "growth" twice in 147622: the scan resumes at the next name's NUL
+    codes = [r["code"] for r in cat.search("growth", limit=None)]
+    assert codes.count("147622") == 1
+    # hits on the first and last names map back through the NUL offsets
+    assert cat.search("banking")[0]["code"] == "119551"
+    assert cat.search("liquid") == [{"code": "100001", "name": "axis Liquid Fund"}]
+
+
+def test_display_names_drop_the_scheme_word(cat):
+    i = cat.index_of("150002")
+    assert cat.name(i) == "ÇAPITAL Protection Oriented  - Series 1"
+    assert cat.row(cat.index_of(150001)) == {"code": "150001", "name": "Ünïcode Fönd Ça  - Direct"}
+
+
+@pytest.mark.parametrize("code", list(SCHEMES)[1:])
+def test_index_of_known_codes(cat, code):
+    assert cat.row(cat.index_of(code)) == {"code": code, "name": SCHEMES[code].replace("Scheme", "").strip()}
+
+
+@pytest.mark.parametrize("code", ["999999", "0", "0119551", "119551.0", "-119551", "", None, "abc"])
+def test_index_of_unknown_codes(cat, code):
+    assert cat.index_of(code) is None
+
+
+def test_nul_in_a_query_finds_nothing(cat):
+    assert cat.search("\x00") == [] and cat.starting_with("\x00a") == [] and cat.starting_with("") == []
+
+
+def test_publish_and_attach(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    catalog.publish(SCHEMES, path)
+    attached = catalog.SchemeCatalog.attach(path)
+    assert attached.rows() == _old_rows(lambda name: True)
+    assert attached.search("ångström") == [{"code": "150003", "name": "Fundo Ångström - Growth"}]
+
+
+def test_ensure_published_downloads_a_fresh_list(tmp_path, monkeypatch):
+    from app import funds
+
+    def cached_client():
+        raise AssertionError("the catalog must not be built from the week-long cached scheme list")
+
+    monkeypatch.setattr(funds, "get_mf", cached_client)
+    monkeypatch.setattr(funds, "fresh_scheme_codes", lambda: dict(SCHEMES))
+    path = str(tmp_path / "catalog.bin")
+    assert catalog.ensure_published(path) is True
+    assert catalog.ensure_published(path) is False  # fresh enough, no second download
+    assert len(catalog.SchemeCatalog.attach(path)) == len(SCHEMES) - 1
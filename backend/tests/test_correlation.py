@@ -0,0 +1,155 @@
+# tests/test_correlation.py
+import asyncio
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import correlation
+from app.database import Base
+from app.models import MutualFund, NavHistory
+
+DAYS = 120
+
+
+def _synthetic(n_groups: int = 5, per_group: int = 4, seed: int = 0):
+    """Schemes in the same group share a factor, so their neighbours are each other."""
+    rng = np.random.default_rng(seed)
+    start = date(2026, 5, 1)
+    codes, dates, navs = [], [], []
+    for g in range(n_groups):
+        factor = rng.normal(0, 0.01, DAYS)
+        for m in range(per_group):
+            rets = factor + rng.normal(0, 0.002, DAYS)
+            prices = 100 * np.cumprod(1 + rets)
+            code = str(100000 + g * 100 + m)
+            codes += [code] * DAYS
+            dates += [start + timedelta(days=t) for t in range(DAYS)]
+            navs += prices.tolist()
+    return np.array(codes), np.array(dates, dtype="datetime64[D]"), np.array(navs)
+
+
+def _group(code: str) -> int:
+    return (int(code) - 100000) // 100
+
+
+def test_build_index_finds_schemes_sharing_a_factor(monkeypatch):
+    monkeypatch.setattr(correlation, "SIMILAR_BLOCK", 3)  # several blocks
+    ids, neighbors, scores = correlation.build_index(*_synthetic(), top_k=3)
+    assert len(ids) == 20 and neighbors.shape == (20, 3)
+    for i, code in enumerate(ids.tolist()):
+        assert i not in neighbors[i]
+        assert {_group(ids[j]) for j in neighbors[i]} == {_group(code)}
+    assert (np.diff(scores, axis=1) <= 0).all() and (scores > 0.9).all()
+
+
+def test_packed_index_round_trip_remaps_unsorted_codes():
+    ids = np.array(["300", "100", "200"])
+    neighbors = np.array([[1, 2], [2, 0], [0, 1]], dtype=np.int32)
+    scores = np.array([[0.9, 0.5], [0.8, 0.4], [0.7, 0.3]], dtype=np.float32)
+    data = correlation.pack_index(ids, neighbors, scores, {"100": "Fund A", "300": "Fund Ç"}, "2026-10-19.1")
+
+    index = correlation.SimilarityIndex(data)
+    assert index.codes.tolist() == [b"100", b"200", b"300"] and index.version == "2026-10-19.1"
+    assert index.similar("300", 2) == [
+        {"code": "100", "name": "Fund A", "correlation": 0.9},
+        {"code": "200", "name": None, "correlation": 0.5},
+    ]
+    assert index.similar("100", 1) == [{"code": "200", "name": None, "correlation": 0.8}]
+    assert index.similar("999", 1) is None and index.name(2) == "Fund Ç"
+
+
+def test_publish_from_nav_history_then_workers_attach(tmp_path, monkeypatch):
+    codes, dates, navs = _synthetic()
+    path = str(tmp_path / "similar.bin")
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/sim.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(NavHistory), [
+                {"scheme_code": c, "nav_date": d, "nav": round(v, 4)}
+                for c, d, v in zip(codes.tolist(), dates.astype(date).tolist(), navs.tolist())
+            ])
+            await conn.execute(insert(MutualFund), [{"scheme_code": "100000", "name": "Group 0 Fund"}])
+        monkeypatch.setattr(correlation, "AsyncSessionLocal", sessionmaker(bind=engine, class_=AsyncSession))
+        try:
+            return await correlation.publish_index(path)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == 20
+
+    monkeypatch.setattr(correlation, "_index", None)
+    index = correlation.load_index(path)
+    assert correlation.load_index(path) is index  # same file, same mapping
+    assert index.version == str(dates.max())
+    monkeypatch.setattr(correlation, "_checked_at", time.monotonic())
+    page = asyncio.run(correlation.get_similar_funds("100001", k=3))
+    assert [_group(s["code"]) for s in page["similar"]] == [0, 0, 0]
+    assert {"code": "100000", "name": "Group 0 Fund"} in [
+        {"code": s["code"], "name": s["name"]} for s in page["similar"]
+    ]
+
+
+def _mfapi(prices: np.ndarray, start: date = date(2026, 1, 1)) -> list[dict]:
+    """mfapi.in rows, latest first."""
+    rows = [{"date": (start + timedelta(days=t)).strftime("%d-%m-%Y"), "nav": f"{p:.4f}"} for t, p in enumerate(prices)]
+    return rows[::-1]
+
+
+def test_aligned_returns_uses_only_shared_dates():
+    d = np.array(["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-05"], dtype="datetime64[D]")
+    e = np.array(["2026-01-02", "2026-01-03", "2026-01-04", "2026-01-05"], dtype="datetime64[D]")
+    common, returns = correlation.aligned_returns([(d, np.array([1.0, 2.0, 4.0, 8.0])), (e, np.array([10.0, 11.0, 12.0, 22.0]))], 30)
+    assert common.astype(str).tolist() == ["2026-01-02", "2026-01-03", "2026-01-05"]
+    np.testing.assert_allclose(returns, [[1.0, 0.1], [1.0, 1.0]])
+
+
+def _matrix(monkeypatch, histories: dict[str, list[dict]], codes: str):
+    async def fake_fetch_json(url, timeout=None, remember=True):
+        return {"meta": {}, "data": histories[url.rsplit("/", 1)[1]]}
+
+    monkeypatch.setattr(correlation.upstream, "fetch_json", fake_fetch_json)
+    monkeypatch.setattr(correlation, "_matrix_cache", correlation.OrderedDict())
+    # no published index: the version falls back to today's date
+    monkeypatch.setattr(correlation, "_index", None)
+    monkeypatch.setattr(correlation, "_checked_at", time.monotonic())
+    return asyncio.run(correlation.get_correlation_matrix(codes, days=365))
+
+
+def test_matrix_is_symmetric_and_sorted_by_code(monkeypatch):
+    rng = np.random.default_rng(1)
+    factor = rng.normal(0, 0.01, 60)
+    a = 100 * np.cumprod(1 + factor)
+    b = 50 * np.cumprod(1 + factor + rng.normal(0, 0.001, 60))
+    c = 20 * np.cumprod(1 + rng.normal(0, 0.01, 60))
+    result = _matrix(monkeypatch, {"300": _mfapi(a), "100": _mfapi(b), "200": _mfapi(c)}, "300,100,200")
+
+    assert result["codes"] == ["100", "200", "300"] and result["observations"] == 59
+    m = np.array(result["matrix"])
+    np.testing.assert_allclose(m, m.T)
+    np.testing.assert_allclose(np.diag(m), 1.0)
+    assert m[0, 2] > 0.95 and abs(m[0, 1]) < 0.5
+    assert result["nav_version"] == date.today().isoformat()
+
+
+def test_matrix_rejects_a_series_without_valid_rows(monkeypatch):
+    unusable = [{"date": "02-01-2026", "nav": "N.A."}, {"date": "01-01-2026", "nav": ""}]
+    histories = {"100": _mfapi(np.linspace(10, 12, 40)), "200": unusable}
+    with pytest.raises(HTTPException) as exc:
+        _matrix(monkeypatch, histories, "100,200")
+    assert exc.value.status_code == 502 and "200" in exc.value.detail
+
+
+def test_nav_version_comes_from_the_published_index(monkeypatch):
+    data = correlation.pack_index(np.array(["100"]), np.zeros((1, 1), dtype=np.int32),
+                                  np.zeros((1, 1), dtype=np.float32), {}, "2026-10-16")
+    monkeypatch.setattr(correlation, "_index", correlation.SimilarityIndex(data))
+    monkeypatch.setattr(correlation, "_checked_at", time.monotonic())
+    assert correlation.nav_version() == "2026-10-16"
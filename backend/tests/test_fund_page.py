@@ -0,0 +1,40 @@
+# tests/test_fund_page.py
+import asyncio
+import json
+
+from app import catalog, fund_page, upstream
+
+
+def _payload(code: str) -> dict:
+    data = [{"date": f"{d:02d}-09-2026", "nav": f"{10 + d / 10:.4f}"} for d in range(30, 0, -1)]
+    return {"meta": {"scheme_code": int(code), "scheme_name": "Upstream Name - Growth"}, "data": data}
+
+
+def _page(monkeypatch, code: str, include: str = "details,history,risk") -> dict:
+    async def fake_fetch_json(url, timeout=None, remember=True):
+        return _payload(code)
+
+    async def no_catalog_build():
+        raise AssertionError("the page must not wait on a catalog build")
+
+    monkeypatch.setattr(upstream, "fetch_json", fake_fetch_json)
+    monkeypatch.setattr(catalog, "get_catalog", no_catalog_build)
+    response = asyncio.run(fund_page.get_fund_page(code, include=include))
+    return json.loads(response.body)
+
+
+def test_page_falls_back_to_upstream_name_without_a_catalog(monkeypatch):
+    monkeypatch.setattr(catalog, "_catalog", None)
+    page = _page(monkeypatch, "100001")
+    assert page["name"] == "Upstream Name - Growth"
+    assert len(page["nav_history"]) == 30 and page["latest"] == {"date": "30-09-2026", "nav": 13.0}
+    assert page["details"]["scheme_start_date"] == {"date": "01-09-2026", "nav": "10.1000"}
+
+
+def test_page_uses_an_attached_catalog(monkeypatch, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    catalog.publish({"100001": "Catalog Fund - Growth"}, path)
+    monkeypatch.setattr(catalog, "_catalog", catalog.SchemeCatalog.attach(path))
+    page = _page(monkeypatch, "100001", include="risk")
+    assert page["name"] == "Catalog Fund - Growth"
+    assert "nav_history" not in page and "details" not in page and "risk" in page
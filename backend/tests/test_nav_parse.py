@@ -0,0 +1,87 @@
+# tests/test_nav_parse.py
+# The NumPy NAV parsing and risk math must give the same results as the
+# pandas code it replaced (tests/pandas_reference.py).
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from app import fundDetail, upstream  # noqa: E402
+from app.fundDetail import _parse_nav_arrays, _parse_nav_values, _risk_metrics, _riskometer_from_nav  # noqa: E402
+from tests.pandas_reference import (  # noqa: E402
+    parse_nav_series_pandas,
+    risk_metrics_pandas,
+    riskometer_pandas,
+    synthetic_history,
+    variants,
+)
+
+BASE = synthetic_history(4000)
+VARIANTS = variants(BASE)
+
+
+@pytest.mark.parametrize("name", list(VARIANTS))
+def test_same_series_and_risk_as_pandas(name):
+    history = VARIANTS[name]
+    ref = parse_nav_series_pandas(history)
+    dates, navs = _parse_nav_arrays(history)
+    assert np.array_equal(ref.index.values.astype("datetime64[D]"), dates)
+    assert np.array_equal(ref.values.astype(np.float64), navs)
+
+    try:
+        ref_metrics = risk_metrics_pandas(ref)
+    except ValueError as e:
+        with pytest.raises(ValueError, match=str(e)):
+            _risk_metrics(navs)
+        return
+    assert np.allclose(ref_metrics, _risk_metrics(navs), rtol=1e-12, atol=0)
+    assert riskometer_pandas(ref) == _riskometer_from_nav(navs)
+
+
+@pytest.mark.parametrize("seed", range(1, 11))
+def test_random_histories_match_pandas(seed):
+    history = synthetic_history(random.Random(seed).randint(11, 6000), seed)
+    ref = parse_nav_series_pandas(history)
+    _, navs = _parse_nav_arrays(history)
+    assert np.array_equal(ref.values, navs)
+    assert riskometer_pandas(ref) == _riskometer_from_nav(navs)
+
+
+@pytest.mark.parametrize("value", [
+    "12.5", "  12.5 ", "1e3", "+5", ".5", "inf", "-Infinity", "nan", "1e-400", 17, 2.5, True, None,
+    "", "N.A.", "1,234.5", "0x10", "1_000", "١٢٣", "١٢.٥", "１２", "\xa012.5", "1e400", "-1.8e308", " inf ",
+])
+def test_nav_values_follow_pandas_to_numeric(value):
+    import pandas as pd
+
+    ref = pd.to_numeric(pd.Series([value, "1.0"], dtype=object), errors="coerce")[0]
+    # first position: the all-at-once path; second: the per-value fallback
+    for values, i in (([value, "1.0"], 0), (["x", value], 1)):
+        got = _parse_nav_values(values)[i]
+        assert (np.isnan(ref) and np.isnan(got)) or ref == got, (value, ref, got)
+
+
+@pytest.mark.parametrize("bad", [[], [{"foo": 1}], [{"date": "01-01-2024"}]])
+def test_invalid_payloads_raise_like_pandas(bad):
+    with pytest.raises(ValueError):
+        parse_nav_series_pandas(bad)
+    with pytest.raises(ValueError):
+        _parse_nav_arrays(bad)
+
+
+@pytest.mark.parametrize("raw", ["123.4567", " 12.5 ", "1e2", "N.A.", "", None, "1_000", "१२", "-"])
+def test_latest_nav_is_parsed_like_the_history(monkeypatch, raw):
+    history = [{"date": "15-10-2026", "nav": raw}] + BASE[1:60]
+
+    async def fake_fetch_json(url, timeout=None, remember=True):
+        return {"meta": {"scheme_name": "Test Fund"}, "data": history}
+
+    monkeypatch.setattr(upstream, "fetch_json", fake_fetch_json)
+    result = asyncio.run(fundDetail.get_mutual_fund_risk("100001"))
+
+    expected = pd.to_numeric(raw if raw is not None else "nan", errors="coerce")
+    assert result["latest_nav"] == (None if pd.isna(expected) else float(expected))
+    assert result["as_of"] == "15-10-2026"
@@ -0,0 +1,174 @@
+# tests/test_nav_refresh.py
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import nav_refresh, upstream
+from app.database import Base
+from app.models import MutualFund, NavHistory
+
+CODES = [str(200000 + i) for i in range(12)]
+LAST = date(2026, 10, 14)  # already stored for every scheme
+
+
+def _history(code: str, days: int = 30) -> list[dict]:
+    """mfapi.in shaped, latest first, ending the day after LAST."""
+    base = 10 + int(code) % 100
+    rows = []
+    for i in range(days):
+        d = LAST + timedelta(days=1 - i)
+        rows.append({"date": d.strftime("%d-%m-%Y"), "nav": f"{base + (days - i) * 0.1 + (i % 3) * 0.05:.4f}"})
+    return rows
+
+
+@pytest.fixture
+def refresh_env(tmp_path, monkeypatch):
+    """Temp SQLite DB seeded with one stored NAV per scheme, checkpoint in tmp_path."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/refresh.db")
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(MutualFund), [
+                {"scheme_code": c, "name": f"Fund {c}", "nav": 1.0, "nav_date": LAST} for c in CODES
+            ])
+            # deliberately different from what upstream reports for LAST
+            await conn.execute(insert(NavHistory), [{"scheme_code": c, "nav_date": LAST, "nav": 1.0} for c in CODES])
+
+    asyncio.run(seed())
+    monkeypatch.setattr(nav_refresh, "AsyncSessionLocal", sessionmaker(bind=engine, class_=AsyncSession))
+    monkeypatch.setattr(nav_refresh, "NAV_REFRESH_CHECKPOINT", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(nav_refresh, "NAV_REFRESH_RATE", 0)
+    monkeypatch.setattr(nav_refresh, "NAV_REFRESH_WORKERS", 3)
+    monkeypatch.setattr(nav_refresh, "WRITE_BATCH", 2)
+    monkeypatch.setattr(nav_refresh, "CHECKPOINT_EVERY", 2)
+    monkeypatch.setattr(nav_refresh, "_scheme_codes", lambda: list(CODES))
+    monkeypatch.setattr(nav_refresh, "scheme_hooks", [])
+    monkeypatch.setattr(nav_refresh, "run_hooks", [])
+    monkeypatch.setattr(nav_refresh, "progress", dict(nav_refresh.progress))
+    fetched: list[str] = []
+    failing: set[str] = set()
+
+    async def fake_fetch_json(url, timeout=None, remember=True):
+        code = url.rsplit("/", 1)[1]
+        fetched.append(code)
+        if code in failing:
+            raise upstream.UpstreamHTTPError("boom", status_code=503)
+        return {"meta": {"scheme_name": f"Fund {code}", "scheme_category": "Equity"}, "data": _history(code)}
+
+    monkeypatch.setattr(upstream, "fetch_json", fake_fetch_json)
+    yield engine, fetched, failing
+    asyncio.run(engine.dispose())
+
+
+def _query(engine, stmt):
+    async def run():
+        async with engine.connect() as conn:
+            return (await conn.execute(stmt)).all()
+
+    return asyncio.run(run())
+
+
+def _checkpoint() -> dict:
+    with open(nav_refresh.NAV_REFRESH_CHECKPOINT) as fh:
+        return json.load(fh)
+
+
+def test_only_newer_navs_are_stored_with_risk(refresh_env):
+    engine, fetched, _ = refresh_env
+    summary = asyncio.run(nav_refresh.refresh_all("2026-10-15"))
+
+    assert summary["done"] == summary["updated"] == len(CODES) and summary["failed"] == 0
+    assert sorted(fetched) == CODES
+    rows = _query(engine, select(NavHistory.nav_date, NavHistory.nav).where(NavHistory.scheme_code == CODES[0]))
+    # LAST keeps the stored value; only the newer day was added
+    assert sorted((d, float(v)) for d, v in rows)[0] == (LAST, 1.0)
+    assert [d for d, _ in sorted(rows)] == [LAST, LAST + timedelta(days=1)]
+
+    funds = _query(engine, select(MutualFund.scheme_code, MutualFund.nav_date, MutualFund.risk_score,
+                                  MutualFund.risk_category))
+    assert all(d == LAST + timedelta(days=1) for _, d, _, _ in funds)
+    assert all(score is not None and category for _, _, score, category in funds)
+    assert _checkpoint()["complete"] is True
+
+
+def test_failed_schemes_stay_pending(refresh_env):
+    engine, fetched, failing = refresh_env
+    failing.add(CODES[3])
+    summary = asyncio.run(nav_refresh.refresh_all("2026-10-15"))
+    assert summary["failed"] == 1
+    cp = _checkpoint()
+    assert cp["complete"] is False and CODES[3] not in cp["done"] and len(cp["done"]) == len(CODES) - 1
+
+    # the next run (same run date) only retries the failed scheme
+    failing.clear()
+    fetched.clear()
+    summary = asyncio.run(nav_refresh.refresh_all())
+    assert fetched == [CODES[3]] and summary["failed"] == 0 and _checkpoint()["complete"] is True
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(refresh_env, monkeypatch):
+    engine, fetched, _ = refresh_env
+    fake = upstream.fetch_json
+    hang = asyncio.Event()
+
+    async def stalls_after_six(url, timeout=None, remember=True):
+        if len(fetched) >= 6:
+            await hang.wait()  # never set: the run is cancelled here
+        return await fake(url, timeout, remember)
+
+    async def interrupted():
+        monkeypatch.setattr(upstream, "fetch_json", stalls_after_six)
+        task = asyncio.create_task(nav_refresh.refresh_all("2026-10-15"))
+        while not task.done() and (len(fetched) < 6 or nav_refresh.progress["done"] < 4):
+            await asyncio.sleep(0.01)
+        assert not task.done(), task.exception()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(interrupted())
+    first_done = set(_checkpoint()["done"])
+    assert first_done and len(first_done) < len(CODES) and not _checkpoint()["complete"]
+
+    monkeypatch.setattr(upstream, "fetch_json", fake)
+    fetched.clear()
+    asyncio.run(nav_refresh.refresh_all())
+    assert set(fetched) == set(CODES) - first_done
+    assert nav_refresh.progress["resumed_from"] == len(first_done) and _checkpoint()["complete"] is True
+    assert len(_query(engine, select(NavHistory.scheme_code))) == 2 * len(CODES)
+
+
+def test_writer_failure_ends_the_run_instead_of_hanging(refresh_env, monkeypatch):
+    def broken_save(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(nav_refresh.Checkpoint, "save", broken_save)
+
+    async def run():
+        await asyncio.wait_for(nav_refresh.refresh_all("2026-10-15"), timeout=5)
+
+    with pytest.raises(OSError, match="disk full"):
+        asyncio.run(run())
+    assert not nav_refresh._run_lock.locked() and nav_refresh.progress["status"] == "idle"
+
+
+def test_a_second_process_cannot_run_at_the_same_time(refresh_env):
+    with nav_refresh._run_file_lock(nav_refresh.NAV_REFRESH_CHECKPOINT):
+        # another open file description conflicts just like another process
+        with pytest.raises(RuntimeError, match="another process"):
+            asyncio.run(nav_refresh.refresh_all("2026-10-15"))
+
+
+def test_manual_trigger_needs_the_scheduler_worker(monkeypatch):
+    import app.main
+
+    monkeypatch.setattr(nav_refresh, "_scheduler_task", None)
+    response = TestClient(app.main.app).post("/api/nav-refresh/run")
+    assert response.status_code == 409 and "NAV_REFRESH_ENABLED" in response.json()["detail"]
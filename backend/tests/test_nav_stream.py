@@ -0,0 +1,140 @@
+# tests/test_nav_stream.py
+import asyncio
+import json
+from datetime import date, timedelta
+
+from app import nav_stream
+from app.nav_stream import CLOSE, PING, RESET, NavHub
+
+DAY = date(2026, 10, 16)
+
+
+def _drain(sub) -> list[bytes]:
+    frames = []
+    while not sub.queue.empty():
+        frames.append(sub.queue.get_nowait())
+    return frames
+
+
+def _event(frame: bytes) -> dict:
+    return json.loads(frame.split(b"data: ", 1)[1])
+
+
+def test_each_subscriber_gets_exactly_its_schemes():
+    async def run():
+        hub = NavHub(queue_size=16)
+        a = hub.subscribe(["1", "2"])
+        b = hub.subscribe(["2", "3"])
+        for code in ("1", "2", "3", "4"):
+            hub.observe(code, DAY, 10.0)
+        return hub, a, b
+
+    hub, a, b = asyncio.run(run())
+    assert [_event(f)["scheme"] for f in _drain(a)] == ["1", "2"]
+    assert [_event(f)["scheme"] for f in _drain(b)] == ["2", "3"]
+    # "2" is encoded once and the same bytes are queued for both
+    assert hub.stats() == {
+        "subscribers": 2, "schemes": 3, "published": 3, "delivered": 4, "dropped_slow_consumers": 0,
+    }
+
+
+def test_only_newer_navs_are_emitted_with_change():
+    async def run():
+        hub = NavHub(queue_size=16)
+        sub = hub.subscribe(["1"])
+        assert hub.observe("1", DAY, 100.0, emit_first=False) == 0  # baseline only
+        assert hub.observe("1", DAY, 101.0) == 0  # same day
+        assert hub.observe("1", DAY - timedelta(days=1), 99.0) == 0  # older
+        assert hub.observe("1", DAY + timedelta(days=1), 102.0) == 1
+        return sub
+
+    frames = _drain(asyncio.run(run()))
+    assert len(frames) == 1 and frames[0].startswith(b"id: 1\nevent: nav\n")
+    assert _event(frames[0]) == {"scheme": "1", "date": "17-10-2026", "nav": 102.0, "change_pct": 2.0}
+
+
+def test_slow_consumer_is_dropped_with_reset_others_intact():
+    async def run():
+        hub = NavHub(queue_size=3)
+        slow = hub.subscribe(["1"])
+        fast = hub.subscribe(["1"])
+        received = []
+        for d in range(5):
+            hub.observe("1", DAY + timedelta(days=d), 10.0 + d)
+            received += _drain(fast)
+        return hub, slow, fast, received
+
+    hub, slow, fast, received = asyncio.run(run())
+    assert slow.closed and _drain(slow) == [RESET]
+    assert not fast.closed and len(received) == 5
+    assert hub.stats()["dropped_slow_consumers"] == 1 and hub.stats()["subscribers"] == 1
+
+
+def test_ping_skips_full_queues_and_close_all_sends_close():
+    async def run():
+        hub = NavHub(queue_size=1)
+        idle = hub.subscribe(["1"])
+        busy = hub.subscribe(["2"])
+        hub.observe("2", DAY, 1.0)
+        hub.ping()
+        pinged = _drain(idle), _drain(busy)
+        hub.observe("2", DAY + timedelta(days=1), 2.0)  # something to discard
+        hub.close_all()
+        return hub, idle, busy, pinged
+
+    hub, idle, busy, (idle_frames, busy_frames) = asyncio.run(run())
+    assert idle_frames == [PING] and len(busy_frames) == 1 and busy_frames[0] != PING
+    assert _drain(idle) == [CLOSE] and _drain(busy) == [CLOSE]
+    assert hub.subscribers == 0 and hub.codes() == []
+
+
+def test_event_stream_unsubscribes_when_the_client_goes_away(monkeypatch):
+    hub = NavHub(queue_size=8)
+    monkeypatch.setattr(nav_stream, "hub", hub)
+
+    async def run():
+        stream = nav_stream._event_stream(["1", "2"])
+        ready = await stream.__anext__()
+        assert b"event: ready" in ready and hub.subscribers == 1
+        hub.observe("2", DAY, 5.0)
+        frame = await stream.__anext__()
+        await stream.aclose()  # what Starlette does on disconnect
+        return frame
+
+    frame = asyncio.run(run())
+    assert _event(frame)["scheme"] == "2"
+    assert hub.subscribers == 0 and hub.codes() == []
+
+
+def test_event_stream_ends_after_reset(monkeypatch):
+    hub = NavHub(queue_size=1)
+    monkeypatch.setattr(nav_stream, "hub", hub)
+
+    async def run():
+        stream = nav_stream._event_stream(["1"])
+        await stream.__anext__()
+        hub.observe("1", DAY, 1.0)
+        hub.observe("1", DAY + timedelta(days=1), 2.0)  # queue full -> dropped
+        return [frame async for frame in stream]
+
+    assert asyncio.run(run()) == [RESET]
+    assert hub.subscribers == 0
+
+
+def test_fake_source_feeds_subscribed_schemes(monkeypatch):
+    hub = NavHub(queue_size=64)
+    monkeypatch.setattr(nav_stream, "hub", hub)
+
+    async def run():
+        source = asyncio.create_task(nav_stream.fake_source(0.001, hub, seed=1))
+        stream = nav_stream._event_stream(["119551"])
+        await stream.__anext__()
+        frames = [await stream.__anext__() for _ in range(3)]
+        source.cancel()
+        await stream.aclose()
+        return frames
+
+    events = [_event(f) for f in asyncio.run(run())]
+    assert {e["scheme"] for e in events} == {"119551"}
+    assert events[0]["change_pct"] is None and events[1]["change_pct"] is not None
+    assert len({e["date"] for e in events}) == 3
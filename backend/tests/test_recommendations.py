@@ -0,0 +1,83 @@
+# tests/test_recommendations.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import questionnaire, recommendations
+from app.database import Base
+from app.models import MutualFund
+
+ROWS = [
+    ("1", "Liquid A", "Debt", 0.0),
+    ("2", "Liquid B", "Debt", 19.99),
+    ("3", "Short Duration", "Debt", 20.0),
+    ("4", "Hybrid", "Hybrid", 39.99),
+    ("5", "Large Cap", "Equity", 40.0),
+    ("6", "Flexi Cap", "Equity", 50.0),
+    ("7", "Mid Cap", "Equity", 59.0),
+    ("8", "Small Cap", "Equity", 99.5),
+    ("9", "Sector", None, 100.0),
+]
+
+
+def _codes(funds: list[dict]) -> list[str]:
+    return [f["code"] for f in funds]
+
+
+def test_bands_are_half_open_except_the_top_one():
+    index = recommendations.RiskIndex(ROWS)
+    assert sorted(_codes(index.lookup(0, 20, 10))) == ["1", "2"]
+    assert sorted(_codes(index.lookup(20, 40, 10))) == ["3", "4"]
+    assert sorted(_codes(index.lookup(80, 100, 10))) == ["8", "9"]
+    assert index.lookup(60, 80, 10) == []
+
+
+def test_ranked_by_distance_to_the_middle_of_the_band():
+    index = recommendations.RiskIndex(ROWS)
+    assert _codes(index.lookup(40, 60, 10)) == ["6", "7", "5"]
+    assert _codes(index.lookup(40, 60, 2)) == ["6", "7"]
+    assert index.lookup(40, 60, 1) == [{"code": "6", "name": "Flexi Cap", "category": "Equity", "risk_score": 50.0}]
+
+
+def test_category_buckets():
+    index = recommendations.RiskIndex(ROWS)
+    assert index.categories() == ["Debt", "Equity", "Hybrid", "Other"]
+    assert _codes(index.lookup(0, 40, 10, "Debt")) == ["3", "2", "1"]
+    # schemes without a category are listed as "Other", keeping category None
+    assert index.lookup(80, 100, 10, "Other") == [{"code": "9", "name": "Sector", "category": None, "risk_score": 100.0}]
+    assert index.lookup(0, 100, 10, "Gold") is None
+
+
+def test_index_is_built_ahead_of_requests(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/risk.db")
+
+    async def build():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(MutualFund), [
+                {"scheme_code": code, "name": name, "category": category, "risk_score": score}
+                for code, name, category, score in ROWS
+            ] + [{"scheme_code": "10", "name": "Not scored yet", "category": "Equity", "risk_score": None}])
+        try:
+            return await recommendations.refresh_index()
+        finally:
+            await engine.dispose()
+
+    monkeypatch.setattr(recommendations, "_index", None)
+    monkeypatch.setattr(recommendations, "AsyncSessionLocal", sessionmaker(bind=engine, class_=AsyncSession))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(questionnaire.get_recommendations("Balanced Growth", category=None, limit=10))
+    assert exc.value.status_code == 503
+
+    index = asyncio.run(build())
+    assert index.size == len(ROWS) and recommendations.get_index() is index
+
+    page = asyncio.run(questionnaire.get_recommendations("Balanced Growth", category="Equity", limit=2))
+    assert _codes(page["funds"]) == ["6", "7"] and page["universe_size"] == len(ROWS)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(questionnaire.get_recommendations("Balanced Growth", category="Gold", limit=2))
+    assert exc.value.status_code == 404
@@ -0,0 +1,221 @@
+# tests/test_upstream.py
+import asyncio
+import json
+import random
+
+import pytest
+
+from app import upstream
+
+URL = "https://api.mfapi.in/mf/{}"
+
+
+class FakeResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+
+
+class FakeClient:
+    """Answers after latency(url, attempt) seconds and counts attempts per URL."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls: dict[str, int] = {}
+
+    async def get(self, url, timeout=None):
+        n = self.calls[url] = self.calls.get(url, 0) + 1
+        await asyncio.sleep(self.latency(url, n))
+        return FakeResponse({"url": url, "attempt": n})
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(upstream, "_hosts", {})
+    monkeypatch.setattr(upstream, "_stale", upstream.OrderedDict())
+    monkeypatch.setattr(upstream, "_stale_bytes", 0)
+    yield
+
+
+def _prime(samples):
+    state = upstream._host_state(URL.format(0))
+    for s in samples:
+        state.latency.record(s)
+    return state
+
+
+def test_slow_request_is_hedged_and_hedge_wins(monkeypatch):
+    client = FakeClient(lambda url, n: 1.0 if n == 1 else 0.01)
+    monkeypatch.setattr(upstream, "_client", client)
+
+    async def run():
+        state = _prime([0.01] * 50)
+        state.hedge_tokens = 1
+        payload = await upstream.fetch_json(URL.format(1))
+        return state, payload
+
+    state, payload = asyncio.run(run())
+    assert payload["attempt"] == 2
+    assert state.counters["hedged"] == 1 and state.counters["hedge_wins"] == 1
+
+
+def test_burst_does_not_hedge_everything(monkeypatch):
+    # p95 around 95 ms; 200 requests at once queue behind the 8-slot semaphore
+    rng = random.Random(7)
+    client = FakeClient(lambda url, n: rng.uniform(0.01, 0.1))
+    monkeypatch.setattr(upstream, "_client", client)
+
+    async def run():
+        state = _prime([0.01 + i * 0.09 / 199 for i in range(200)])
+        await asyncio.gather(*(upstream.fetch_json(URL.format(i)) for i in range(200)))
+        return state
+
+    state = asyncio.run(run())
+    # budget: the saved-up burst plus HEDGE_MAX_RATIO of the requests
+    assert state.counters["hedged"] <= 1 + 200 * upstream.HEDGE_MAX_RATIO
+    assert sum(client.calls.values()) == 200 + state.counters["hedged"]
+
+
+def test_queue_time_does_not_count_towards_hedge_delay(monkeypatch):
+    # every request takes 40 ms against a 50 ms hedge delay, but most of them
+    # wait far longer than that for a semaphore slot
+    client = FakeClient(lambda url, n: 0.04)
+    monkeypatch.setattr(upstream, "_client", client)
+
+    async def run():
+        state = _prime([0.04] * 50)
+        state.hedge_tokens = upstream.HEDGE_BURST
+        await asyncio.gather(*(upstream.fetch_json(URL.format(i)) for i in range(64)))
+        return state
+
+    state = asyncio.run(run())
+    assert state.counters["hedged"] == 0
+
+
+def test_stale_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(upstream, "STALE_CACHE_BYTES", 200)
+    for i in range(20):
+        upstream._remember(URL.format(i), b"x" * 50)
+    assert upstream._stale_bytes == sum(len(v) for v in upstream._stale.values()) <= 200
+    assert list(upstream._stale) == [URL.format(i) for i in range(16, 20)]
+    upstream._remember("too-big", b"x" * 201)
+    assert "too-big" not in upstream._stale
+
+
+def test_remember_false_bypasses_stale_cache(monkeypatch):
+    monkeypatch.setattr(upstream, "_client", FakeClient(lambda url, n: 0))
+
+    async def run():
+        await upstream.fetch_json(URL.format(1), remember=False)
+        await upstream.fetch_json(URL.format(2))
+
+    asyncio.run(run())
+    assert list(upstream._stale) == [URL.format(2)]
+    assert json.loads(upstream._stale[URL.format(2)]) == {"url": URL.format(2), "attempt": 1}
+
+
+# ---------------------------
+# Circuit breaker
+# ---------------------------
+class ScriptedClient:
+    """Each get() plays the next step: an HTTP status or an exception."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.calls = 0
+
+    async def get(self, url, timeout=None):
+        self.calls += 1
+        step = self.steps.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return FakeResponse({"url": url, "status": step}, status_code=step)
+
+
+def _fetch(url: str = URL.format(1)):
+    return asyncio.run(upstream.fetch_json(url))
+
+
+def test_breaker_opens_after_failures_and_fails_fast(monkeypatch):
+    import httpx
+
+    # 5xx answers and network errors both count
+    steps = [500, httpx.ConnectError("down")] * upstream.BREAKER_FAILURES
+    client = ScriptedClient(steps[:upstream.BREAKER_FAILURES])
+    monkeypatch.setattr(upstream, "_client", client)
+
+    for _ in range(upstream.BREAKER_FAILURES):
+        with pytest.raises(upstream.UpstreamError):
+            _fetch()
+    state = upstream._host_state(URL.format(1))
+    assert state.breaker.state == upstream.CircuitBreaker.OPEN
+
+    with pytest.raises(upstream.UpstreamUnavailable, match="circuit open"):
+        _fetch()
+    assert client.calls == upstream.BREAKER_FAILURES  # no request while open
+    assert state.counters["rejected"] == 1
+
+
+def test_open_breaker_serves_the_stale_entry(monkeypatch):
+    monkeypatch.setattr(upstream, "_client", ScriptedClient([200] + [503] * upstream.BREAKER_FAILURES))
+    assert _fetch()["status"] == 200
+    # failures are answered from the last good response, then the breaker opens
+    for _ in range(upstream.BREAKER_FAILURES):
+        assert _fetch()["status"] == 200
+    state = upstream._host_state(URL.format(1))
+    assert state.breaker.state == upstream.CircuitBreaker.OPEN
+    assert _fetch()["status"] == 200
+    assert state.counters["rejected"] == 1 and state.counters["served_stale"] == upstream.BREAKER_FAILURES + 1
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success(monkeypatch):
+    breaker = upstream.CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    clock = [1000.0]
+    monkeypatch.setattr(upstream.time, "monotonic", lambda: clock[0])
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+    clock[0] += 10
+    assert breaker.allow() and breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow()  # the trial is still out
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED and breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens(monkeypatch):
+    breaker = upstream.CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    clock = [1000.0]
+    monkeypatch.setattr(upstream.time, "monotonic", lambda: clock[0])
+    breaker.record_failure()
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+
+
+def test_4xx_answers_do_not_trip_the_breaker(monkeypatch):
+    monkeypatch.setattr(upstream, "_client", ScriptedClient([404] * (upstream.BREAKER_FAILURES + 2)))
+    for _ in range(upstream.BREAKER_FAILURES + 2):
+        with pytest.raises(upstream.UpstreamHTTPError) as exc:
+            _fetch()
+        assert exc.value.status_code == 404
+    state = upstream._host_state(URL.format(1))
+    assert state.breaker.state == upstream.CircuitBreaker.CLOSED and state.counters["failures"] == 0
+
+
+def test_status_endpoint_shows_breaker_state(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import app.main
+
+    monkeypatch.setattr(upstream, "_client", ScriptedClient([500] * upstream.BREAKER_FAILURES))
+    for _ in range(upstream.BREAKER_FAILURES):
+        with pytest.raises(upstream.UpstreamHTTPError):
+            _fetch()
+    body = TestClient(app.main.app).get("/api/upstream/status").json()
+    host = body["hosts"]["api.mfapi.in"]
+    assert host["breaker"] == "open"
+    assert host["consecutive_failures"] == upstream.BREAKER_FAILURES
+    assert host["failures"] == upstream.BREAKER_FAILURES and body["stale_cache_entries"] == 0
@@ -22,64 +22,51 @@ export default function FundDetail() {
 
   useEffect(() => {
     if (!schemeCode) return; // Prevent fetch if param is missing
-    // NAV history API: /api/funds/nav_history/:schemeCode
-    const fetchNavHistory = async () => {
-      try {
-        const response = await fetch(`http://localhost:8000/api/funds/nav_history/${schemeCode}`);
-        if (!response.ok) throw new Error('Failed to fetch NAV history');
-        const data = await response.json();
-        // Expect data.data to be array of {date, nav}
-        const sortedNavHistory = (data.data || []).sort((a, b) => {
-          const dateA = new Date(a.date.split('-').reverse().join('-'));
-          const dateB = new Date(b.date.split('-').reverse().join('-'));
-          return dateA - dateB;
-        });
-        setNavHistory(sortedNavHistory);
-      } catch (err) {
-        setError(err.message);
-      }
-    };
-    fetchNavHistory();
-  }, [schemeCode]);
-
-  useEffect(() => {
-    if (!schemeCode) return; // Prevent fetch if param is missing
-    // Fund details API: /api/funds/details/:schemeCode
-    const fetchFundDetails = async () => {
+    // Fund page API: /api/funds/page/:schemeCode returns details, the NAV
+    // history (sorted oldest → newest) and risk from a single upstream fetch
+    const controller = new AbortController();
+    const fetchFundPage = async () => {
       try {
-        const response = await fetch(`http://localhost:8000/api/funds/details/${encodeURIComponent(schemeCode)}`);
+        setRiskError(null);
+        const response = await fetch(
+          `http://localhost:8000/api/funds/page/${encodeURIComponent(schemeCode)}`,
+          { signal: controller.signal }
+        );
         if (!response.ok) throw new Error('Failed to fetch fund details');
         const data = await response.json();
-        setFundDetails(data);
+        setNavHistory(data.nav_history || []);
+        setFundDetails(data.details);
+        if (data.risk) {
+          setRisk({ risk: data.risk, disclaimer: data.risk_disclaimer });
+        } else {
+          setRiskError(data.risk_error || "Risk data unavailable");
+        }
       } catch (err) {
-        setError(err.message);
+        if (err.name !== "AbortError") setError(err.message);
       } finally {
         setLoading(false);
       }
     };
-    fetchFundDetails();
+    fetchFundPage();
+    return () => controller.abort();
   }, [schemeCode]);
 
   useEffect(() => {
-    if (!schemeCode) return; // Prevent fetch if param is missing
-    // Risk API: /api/mutual-funds/risk/:schemeCode
-    const controller = new AbortController();
-    const run = async () => {
-      try {
-        setRiskError(null);
-        const res = await fetch(
-          `http://localhost:8000/api/mutual-funds/risk/${encodeURIComponent(schemeCode)}`,
-          { signal: controller.signal }
-        );
-        if (!res.ok) throw new Error(`Failed to fetch risk: ${res.status}`);
-        const data = await res.json();
-        setRisk(data);
-      } catch (e) {
-        if (e.name !== "AbortError") setRiskError(e.message || String(e));
-      }
-    };
-    run();
-    return () => controller.abort();
+    if (!schemeCode) return;
+    // Live NAV updates: the server pushes {scheme, date, nav, change_pct}
+    // when a new NAV lands, so the history doesn't have to be re-fetched.
+    const source = new EventSource(
+      `http://localhost:8000/api/nav-stream?codes=${encodeURIComponent(schemeCode)}`
+    );
+    source.addEventListener("nav", (e) => {
+      const update = JSON.parse(e.data);
+      setNavHistory((prev) => {
+        const last = prev[prev.length - 1];
+        if (last && last.date === update.date) return prev;
+        return [...prev, { date: update.date, nav: String(update.nav) }];
+      });
+    });
+    return () => source.close();
   }, [schemeCode]);
 
   const getCurrentNav = () => {
@@ -139,7 +126,7 @@ export default function FundDetail() {
   return (
     <div className={styles.container}>
       <div className={styles.header}>
-        <h1 className={styles.fundName}>{fundName}</h1>
+        <h1 className={styles.fundName}>{fundName || fundDetails.scheme_name}</h1>
         <div className={styles.currentNav}>
           <span>Current NAV:{getCurrentNav()}</span>
           <span className={styles.navValue}>{fundDetails.current_nav}</span>
@@ -10,6 +10,7 @@ export default function Questionnaire() {
   const [currentIndex, setCurrentIndex] = useState(0);
   const [question, setQuestion] = useState(null);
   const [result, setResult] = useState(null);
+  const [recommendations, setRecommendations] = useState([]);
   const [loading, setLoading] = useState(false);
   const navigate = useNavigate();
 
@@ -48,6 +49,7 @@ export default function Questionnaire() {
         if (nextIdx !== -1) setCurrentIndex(nextIdx);
       } else if (response.data.result) {
         setResult(response.data.result);
+        setRecommendations(response.data.recommendations || []);
         setQuestion(null);
       }
     } catch (err) {
@@ -62,6 +64,26 @@ export default function Questionnaire() {
     <div className={styles.card}>
       <h2 className={styles.title}>Your Investor Profile</h2>
       <p className={styles.resultText}>{result}</p>
+      {recommendations.length > 0 && (
+        <div className={styles.recommendations}>
+          <h3>Funds matching your profile</h3>
+          <ul>
+            {recommendations.map((fund) => (
+              <li
+                key={fund.code}
+                onClick={() =>
+                  navigate(`/api/funds/details/${fund.code}`, { state: { fundName: fund.name } })
+                }
+              >
+                <span>{fund.name}</span>
+                <span className={styles.recommendationMeta}>
+                  {fund.category} · risk {fund.risk_score}
+                </span>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
       <button
         className={styles.optionButton}
         style={{ marginTop: "2rem" }}